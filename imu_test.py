@@ -1,16 +1,29 @@
 #!/usr/bin/env python3
 from mpu6050 import mpu6050
-import math, time
+from smbus2 import SMBus
+import math, struct, time
 
-imu = mpu6050(0x68)
+ADDR = 0x68
+ACCEL_SCALE = 9.80665 / 16384.0
+atan2, sqrt = math.atan2, math.sqrt
+R2D = 180.0 / math.pi
+
+imu = mpu6050(ADDR)  # Wakes the sensor up
+bus = SMBus(1)
 print("MPU6050 Test - Ctrl+C stop")
+next_t = time.monotonic()
 try:
     while True:
-        a = imu.get_accel_data()
+        # One block read for accel X/Y/Z instead of one transaction per register
+        ax, ay, az = struct.unpack('>hhh', bytes(bus.read_i2c_block_data(ADDR, 0x3B, 6)))
+        ax, ay, az = ax * ACCEL_SCALE, ay * ACCEL_SCALE, az * ACCEL_SCALE
         g = imu.get_gyro_data()
-        pitch = math.atan2(a['y'], math.sqrt(a['x']**2 + a['z']**2)) * 57.3
-        roll = math.atan2(-a['x'], a['z']) * 57.3
+        pitch = atan2(ay, sqrt(ax * ax + az * az)) * R2D
+        roll = atan2(-ax, az) * R2D
         print(f"\rPitch:{pitch:+5.1f} Roll:{roll:+5.1f} Gx:{g['x']:+5.1f}", end="")
-        time.sleep(0.1)
+        next_t += 0.1
+        dt = next_t - time.monotonic()
+        if dt > 0:
+            time.sleep(dt)
 except KeyboardInterrupt:
     print("\nDone")
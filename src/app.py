@@ -1,5 +1,4 @@
 import streamlit as st
-import requests
 import sys
 import os
 import socket
@@ -7,13 +6,24 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-st.set_page_config(
-    page_title="MicroSpot",
-    page_icon="🐕",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+from components.control_page import render_control_page
+from components.servo_page import render_servo_page
+from components.tuning_page import render_tuning_page
+from components.imu_page import render_imu_page
+from components.settings_page import render_settings_page
+from components.api import fetch_status, get_session
+
+PAGES = {
+    "Control": render_control_page,
+    "Servos": render_servo_page,
+    "Tuning": render_tuning_page,
+    "IMU": render_imu_page,
+    "Settings": render_settings_page,
+}
 
+# Resolved once per server process - Streamlit re-executes this script on every
+# rerun, so a plain module global or lru_cache would not survive between reruns
+@st.cache_resource(show_spinner=False)
 def get_backend_url():
     if "MICROSPOT_BACKEND" in os.environ:
         return os.environ["MICROSPOT_BACKEND"]
@@ -25,6 +35,22 @@ def get_backend_url():
 
 API_URL = get_backend_url()
 
+st.set_page_config(
+    page_title="MicroSpot",
+    page_icon="🐕",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+_SESSION = get_session()
+
+# Sidebar angles are cached briefly so rapid reruns (every widget click) share one request
+@st.cache_data(ttl=0.5, show_spinner=False)
+def fetch_angles(url):
+    """Get live IMU pitch/roll, or None if unavailable"""
+    resp = _SESSION.get(f"{url}/api/balance/angles", timeout=0.3)
+    return resp.json() if resp.status_code == 200 else None
+
 # Clean CSS
 st.markdown("""
 <style>
@@ -39,16 +65,15 @@ st.markdown("""
 # Sidebar
 st.sidebar.title("MicroSpot")
 
-# Connection status
-try:
-    resp = requests.get(f"{API_URL}/api/status", timeout=1)
+# Connection status (cached briefly so rapid reruns share one request)
+ok, _ = fetch_status(API_URL)
+if ok:
     st.sidebar.success("Connected")
 
     # Live IMU pitch/roll in sidebar
     try:
-        imu_resp = requests.get(f"{API_URL}/api/balance/angles", timeout=0.5)
-        if imu_resp.status_code == 200:
-            imu_data = imu_resp.json()
+        imu_data = fetch_angles(API_URL)
+        if imu_data is not None:
             pitch = imu_data.get("pitch", 0)
             roll = imu_data.get("roll", 0)
 
@@ -68,31 +93,16 @@ try:
             st.sidebar.caption(f"{color} Tilt: {max_tilt:.1f}°")
     except:
         pass
-
-except:
+else:
     st.sidebar.error("Disconnected")
 
 st.sidebar.divider()
 
 page = st.sidebar.radio(
     "Navigation",
-    ["Control", "Servos", "Tuning", "IMU", "Settings"],
+    list(PAGES),
     label_visibility="collapsed"
 )
 
 # Route pages
-if page == "Control":
-    from components.control_page import render_control_page
-    render_control_page(API_URL)
-elif page == "Servos":
-    from components.servo_page import render_servo_page
-    render_servo_page(API_URL)
-elif page == "Tuning":
-    from components.tuning_page import render_tuning_page
-    render_tuning_page(API_URL)
-elif page == "IMU":
-    from components.imu_page import render_imu_page
-    render_imu_page(API_URL)
-elif page == "Settings":
-    from components.settings_page import render_settings_page
-    render_settings_page(API_URL)
+PAGES[page](API_URL)
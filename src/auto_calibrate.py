@@ -16,9 +16,13 @@ Features:
 import argparse
 import time
 import json
+import os
 import sys
 import math
+from collections import namedtuple
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
 # ============== CONFIGURATION ==============
@@ -50,24 +54,46 @@ SERVO_CONSTRAINTS = {
     },
 }
 
-# Leg configuration
+# Leg configuration: servo channels per joint, side direction, collision-free ankle angle
+LegCfg = namedtuple("LegCfg", "hip knee ankle direction ankle_forward")
+
 LEG_CONFIG = {
-    "FL": {"hip": 0, "knee": 1, "ankle": 2, "direction": -1, "ankle_forward": 0},
-    "FR": {"hip": 3, "knee": 4, "ankle": 5, "direction": 1, "ankle_forward": 180},
-    "RL": {"hip": 6, "knee": 7, "ankle": 8, "direction": -1, "ankle_forward": 0},
-    "RR": {"hip": 9, "knee": 10, "ankle": 11, "direction": 1, "ankle_forward": 180},
+    "FL": LegCfg(hip=0, knee=1, ankle=2, direction=-1, ankle_forward=0),
+    "FR": LegCfg(hip=3, knee=4, ankle=5, direction=1, ankle_forward=180),
+    "RL": LegCfg(hip=6, knee=7, ankle=8, direction=-1, ankle_forward=0),
+    "RR": LegCfg(hip=9, knee=10, ankle=11, direction=1, ankle_forward=180),
 }
 
 # IMU collision detection thresholds
 COLLISION_THRESHOLD = 15.0  # Degrees - sudden pitch/roll change indicates collision
 IMU_SAMPLE_RATE = 0.05      # Seconds between IMU samples
 
+# Prefer orjson (C-backed) for calibration.json I/O, fall back to stdlib json
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj):
+        return json.dumps(obj, indent=2).encode()
+
 # ============== API HELPERS ==============
 
+# Shared keep-alive session - avoids a new TCP connection per servo/IMU call
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 def api_get(endpoint):
     """GET request to API"""
     try:
-        resp = requests.get(f"{API_URL}{endpoint}", timeout=2)
+        resp = _SESSION.get(f"{API_URL}{endpoint}", timeout=2)
         return resp.json() if resp.ok else None
     except:
         return None
@@ -75,7 +101,7 @@ def api_get(endpoint):
 def api_post(endpoint, data=None):
     """POST request to API"""
     try:
-        resp = requests.post(f"{API_URL}{endpoint}", json=data or {}, timeout=2)
+        resp = _SESSION.post(f"{API_URL}{endpoint}", json=data or {}, timeout=2)
         return resp.json() if resp.ok else None
     except:
         return None
@@ -84,6 +110,24 @@ def set_servo(channel, angle):
     """Set a single servo to a specific angle"""
     return api_post(f"/api/servo/{channel}", {"angle": angle})
 
+def set_servos_batch(angles):
+    """Set several servos in one request (dict of channel -> angle)"""
+    return api_post("/api/servo/batch", {"angles": angles})
+
+def sweep_servo_stream(channel, start, stop, delay, max_step, slow_zone):
+    """
+    Start a backend-side servo sweep.
+
+    Returns a streaming response yielding one JSON line {angle, pitch, roll} per step.
+    Closing the response stops the sweep.
+    """
+    resp = _SESSION.post(f"{API_URL}/api/servo/sweep", json={
+        "channel": channel, "start": start, "stop": stop, "delay": delay,
+        "max_step": max_step, "slow_zone": slow_zone,
+    }, stream=True, timeout=(2, delay + 2))
+    resp.raise_for_status()
+    return resp
+
 def get_imu_angles():
     """Get current IMU pitch/roll"""
     data = api_get("/api/balance/angles")
@@ -94,41 +138,45 @@ def get_imu_angles():
 def load_calibration():
     """Load current calibration from file"""
     if CALIBRATION_FILE.exists():
-        with open(CALIBRATION_FILE) as f:
-            return json.load(f)
+        return _loads(CALIBRATION_FILE.read_bytes())
     return {"servos": {}}
 
+def _write_atomic(path, data):
+    """Write bytes to a temp file and rename over path, so an interrupted save can't truncate it"""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
 def save_calibration(calibration):
     """Save calibration to file"""
-    with open(CALIBRATION_FILE, 'w') as f:
-        json.dump(calibration, f, indent=2)
+    _write_atomic(CALIBRATION_FILE, _dumps(calibration))
 
 # ============== COLLISION DETECTION ==============
 
 class CollisionDetector:
-    """Monitors IMU for sudden changes indicating collision"""
+    """Flags sudden IMU changes indicating collision"""
 
     def __init__(self, threshold=COLLISION_THRESHOLD):
         self.threshold = threshold
+        self.threshold_sq = threshold * threshold
         self.last_pitch = 0
         self.last_roll = 0
         self.collision_detected = False
 
-    def update(self):
-        """Check for collision based on IMU change"""
-        pitch, roll = get_imu_angles()
-
-        pitch_delta = abs(pitch - self.last_pitch)
-        roll_delta = abs(roll - self.last_roll)
+    def update(self, pitch, roll):
+        """Check for collision based on the change since the previous sample"""
+        dp = pitch - self.last_pitch
+        dr = roll - self.last_roll
 
         self.last_pitch = pitch
         self.last_roll = roll
 
-        if pitch_delta > self.threshold or roll_delta > self.threshold:
+        # Combined (L2) tilt change, compared squared to skip abs()/sqrt
+        if dp * dp + dr * dr > self.threshold_sq:
             self.collision_detected = True
-            return True, pitch, roll
+            return True
 
-        return False, pitch, roll
+        return False
 
     def reset(self):
         """Reset collision state"""
@@ -142,16 +190,12 @@ def set_safe_position(leg_id):
     config = LEG_CONFIG[leg_id]
     print(f"  Setting {leg_id} to safe position...")
 
-    # Hip to center
-    set_servo(config["hip"], 90)
-    time.sleep(0.2)
-
-    # Knee to 90 (bent)
-    set_servo(config["knee"], 90)
-    time.sleep(0.2)
-
-    # Ankle forward (collision-free position)
-    set_servo(config["ankle"], config["ankle_forward"])
+    # Hip to center, knee to 90 (bent), ankle forward (collision-free position)
+    set_servos_batch({
+        config.hip: 90,
+        config.knee: 90,
+        config.ankle: config.ankle_forward,
+    })
     time.sleep(0.3)
 
     print(f"  {leg_id} in safe position")
@@ -164,42 +208,57 @@ def sweep_find_neutral(leg_id, joint, min_angle, max_angle, collision_detector):
     Returns: (neutral_angle, success)
     """
     config = LEG_CONFIG[leg_id]
-    channel = config[joint]
+    channel = getattr(config, joint)  # Resolved once, not per sweep step
     constraints = SERVO_CONSTRAINTS[joint]
 
-    step = constraints["sweep_step"]
+    # Adaptive step (done by the backend): up to 2x sweep_step while the IMU is quiet,
+    # shrinking towards 1° as the smoothed IMU change approaches half the collision threshold
+    max_step = constraints["sweep_step"] * 2
     delay = constraints["sweep_delay"]
+    slow_zone = 0.5 * collision_detector.threshold
 
     print(f"\n  Sweeping {leg_id} {joint} ({min_angle}° to {max_angle}°)...")
     print(f"  Press Ctrl+C to stop and set neutral at current position")
 
     collision_detector.reset()
-    current_angle = min_angle
+    current_angle = prev_angle = min_angle
+    last_ui = 0.0
+    resp = None
 
     try:
-        # Sweep from min to max
-        while current_angle <= max_angle:
-            set_servo(channel, current_angle)
-            time.sleep(delay)
+        # The backend steps the servo and streams an IMU sample after each step
+        resp = sweep_servo_stream(channel, min_angle, max_angle, delay, max_step, slow_zone)
+        for line in resp.iter_lines():
+            if not line:
+                continue
+            sample = _loads(line)
+            prev_angle, current_angle = current_angle, sample["angle"]
+            pitch, roll = sample["pitch"], sample["roll"]
 
             # Check for collision
-            collision, pitch, roll = collision_detector.update()
-            if collision:
+            if collision_detector.update(pitch, roll):
+                resp.close()  # Disconnecting stops the backend sweep
                 print(f"\n  COLLISION DETECTED at {current_angle}°! (pitch={pitch:.1f}°, roll={roll:.1f}°)")
                 print(f"  Returning to safe position...")
                 set_safe_position(leg_id)
-                return current_angle - step, False
+                return prev_angle, False
 
-            # Progress indicator
-            sys.stdout.write(f"\r  Angle: {current_angle}° | IMU: pitch={pitch:.1f}°, roll={roll:.1f}°    ")
-            sys.stdout.flush()
-
-            current_angle += step
+            # Progress indicator (throttled to ~10 Hz to keep tty writes off the hot path)
+            now = time.monotonic()
+            if now - last_ui > 0.1:
+                sys.stdout.write(f"\r  Angle: {current_angle}° | IMU: pitch={pitch:.1f}°, roll={roll:.1f}°    ")
+                sys.stdout.flush()
+                last_ui = now
 
         print(f"\n  Sweep complete!")
 
     except KeyboardInterrupt:
         print(f"\n  Stopped at {current_angle}°")
+    except requests.RequestException as e:
+        print(f"\n  Sweep failed: {e}")
+    finally:
+        if resp is not None:
+            resp.close()
 
     # Ask user for neutral position
     print(f"\n  Current servo at {current_angle}°")
@@ -233,6 +292,15 @@ def calibrate_leg(leg_id, collision_detector):
     """
     config = LEG_CONFIG[leg_id]
     calibration = load_calibration()
+    results = {}
+
+    def record(joint, angle):
+        """Store a found neutral in the in-memory calibration (saved once at the end)"""
+        results[joint] = angle
+        servo = calibration["servos"].get(str(getattr(config, joint)))
+        if servo is not None:
+            servo["neutral_angle"] = angle
+            servo["calibrated"] = True
 
     print(f"\n{'='*50}")
     print(f"  CALIBRATING {leg_id} LEG")
@@ -242,10 +310,8 @@ def calibrate_leg(leg_id, collision_detector):
     set_safe_position(leg_id)
     time.sleep(0.5)
 
-    results = {}
-
     # 2. Calibrate HIP (limited range - never go to extremes!)
-    print(f"\n--- HIP (channel {config['hip']}) ---")
+    print(f"\n--- HIP (channel {config.hip}) ---")
     print(f"  IMPORTANT: Hip range limited to 45-135° to prevent collision!")
     hip_neutral, success = sweep_find_neutral(
         leg_id, "hip",
@@ -254,17 +320,12 @@ def calibrate_leg(leg_id, collision_detector):
         collision_detector
     )
     if success:
-        results["hip"] = hip_neutral
-        # Update calibration
-        ch_str = str(config["hip"])
-        if ch_str in calibration["servos"]:
-            calibration["servos"][ch_str]["neutral_angle"] = hip_neutral
-            calibration["servos"][ch_str]["calibrated"] = True
+        record("hip", hip_neutral)
 
     # 3. Calibrate KNEE (full range, ankle stays forward)
-    print(f"\n--- KNEE (channel {config['knee']}) ---")
+    print(f"\n--- KNEE (channel {config.knee}) ---")
     print(f"  Setting ankle to forward position for collision-free knee sweep...")
-    set_servo(config["ankle"], config["ankle_forward"])
+    set_servo(config.ankle, config.ankle_forward)
     time.sleep(0.3)
 
     knee_neutral, success = sweep_find_neutral(
@@ -274,16 +335,12 @@ def calibrate_leg(leg_id, collision_detector):
         collision_detector
     )
     if success:
-        results["knee"] = knee_neutral
-        ch_str = str(config["knee"])
-        if ch_str in calibration["servos"]:
-            calibration["servos"][ch_str]["neutral_angle"] = knee_neutral
-            calibration["servos"][ch_str]["calibrated"] = True
+        record("knee", knee_neutral)
 
     # 4. Calibrate ANKLE (full range, knee at neutral)
-    print(f"\n--- ANKLE (channel {config['ankle']}) ---")
+    print(f"\n--- ANKLE (channel {config.ankle}) ---")
     print(f"  Setting knee to neutral position for collision-free ankle sweep...")
-    set_servo(config["knee"], results.get("knee", 90))
+    set_servo(config.knee, results.get("knee", 90))
     time.sleep(0.3)
 
     ankle_neutral, success = sweep_find_neutral(
@@ -293,13 +350,9 @@ def calibrate_leg(leg_id, collision_detector):
         collision_detector
     )
     if success:
-        results["ankle"] = ankle_neutral
-        ch_str = str(config["ankle"])
-        if ch_str in calibration["servos"]:
-            calibration["servos"][ch_str]["neutral_angle"] = ankle_neutral
-            calibration["servos"][ch_str]["calibrated"] = True
+        record("ankle", ankle_neutral)
 
-    # Save calibration
+    # Save calibration (single atomic write for the whole leg)
     save_calibration(calibration)
     print(f"\n  Calibration saved for {leg_id}: {results}")
 
@@ -320,44 +373,45 @@ def measure_walking_quality(duration=5.0):
     api_post("/api/gait/start")
     time.sleep(0.5)
 
-    # Collect IMU samples
-    samples = []
-    start_time = time.time()
-
-    while time.time() - start_time < duration:
-        pitch, roll = get_imu_angles()
-        samples.append({"pitch": pitch, "roll": roll, "time": time.time() - start_time})
-        time.sleep(IMU_SAMPLE_RATE)
+    # Collect IMU samples into a preallocated (N, 2) pitch/roll buffer
+    buf = np.empty((int(duration / IMU_SAMPLE_RATE) + 8, 2), dtype=np.float32)
+    n = 0
+    start_time = time.monotonic()
+    next_t = start_time
+
+    # Fixed-cadence sampling: sleep until the next deadline rather than a fixed
+    # delay after each (variable-latency) API call, so samples stay on the grid
+    while time.monotonic() - start_time < duration and n < len(buf):
+        buf[n] = get_imu_angles()  # Written straight into the buffer, no per-sample objects
+        n += 1
+        next_t += IMU_SAMPLE_RATE
+        dt = next_t - time.monotonic()
+        if dt > 0:
+            time.sleep(dt)
 
     # Stop walking
     api_post("/api/gait/stop")
     time.sleep(0.5)
 
     # Calculate metrics
-    if not samples:
+    if n == 0:
         return {"error": "No samples collected"}
 
-    pitches = [s["pitch"] for s in samples]
-    rolls = [s["roll"] for s in samples]
-
-    def variance(values):
-        mean = sum(values) / len(values)
-        return sum((x - mean) ** 2 for x in values) / len(values)
-
-    def max_deviation(values):
-        mean = sum(values) / len(values)
-        return max(abs(x - mean) for x in values)
+    samples = buf[:n]
+    means = samples.mean(axis=0)
+    variances = samples.var(axis=0)
+    max_devs = np.abs(samples - means).max(axis=0)
 
     metrics = {
-        "samples": len(samples),
+        "samples": n,
         "duration": duration,
-        "pitch_variance": variance(pitches),
-        "roll_variance": variance(rolls),
-        "pitch_max_dev": max_deviation(pitches),
-        "roll_max_dev": max_deviation(rolls),
-        "pitch_mean": sum(pitches) / len(pitches),
-        "roll_mean": sum(rolls) / len(rolls),
-        "quality_score": 100 - (variance(pitches) + variance(rolls)) * 5,  # Higher = better
+        "pitch_variance": float(variances[0]),
+        "roll_variance": float(variances[1]),
+        "pitch_max_dev": float(max_devs[0]),
+        "roll_max_dev": float(max_devs[1]),
+        "pitch_mean": float(means[0]),
+        "roll_mean": float(means[1]),
+        "quality_score": float(100 - (variances[0] + variances[1]) * 5),  # Higher = better
     }
 
     print(f"\n  Walking Quality Metrics:")
@@ -4,6 +4,8 @@ Balance Controller for MicroSpot
 Uses MPU6050 IMU for pitch/roll measurement and balance correction
 """
 import math
+import struct
+import threading
 import time
 
 # Try to import MPU6050, allow simulation mode if not available
@@ -14,12 +16,37 @@ except ImportError:
     MPU_AVAILABLE = False
     print("Warning: mpu6050 package not available, balance will use simulated values")
 
+# smbus2 gives us a raw bus handle for single-transaction block reads
+try:
+    from smbus2 import SMBus
+    SMBUS_AVAILABLE = True
+except ImportError:
+    SMBUS_AVAILABLE = False
+
+# MPU6050 registers / scaling
+ACCEL_XOUT_H = 0x3B          # Start of the 14-byte accel/temp/gyro block (big-endian int16)
+ACCEL_SCALE = 9.80665 / 16384.0  # +-2g range: 16384 LSB/g -> m/s^2
+GYRO_SCALE = 1.0 / 131.0         # +-250°/s range: 131 LSB/(°/s) -> °/s
+
+# Complementary filter time constant (s): the gyro angle is trusted short-term and
+# pulled to the accel angle over ~tau. The per-sample weight is tau / (tau + dt),
+# so the correction speed does not depend on how often callers read the IMU.
+COMP_FILTER_TAU = 0.5
+COMP_FILTER_MAX_DT = 0.5     # Re-seed from accel if samples are further apart than this
+
+CALIBRATION_TIMEOUT = 0.2    # Max seconds spent collecting calibration samples
+
+# Bound once for the per-sample path
+_atan2 = math.atan2
+_sqrt = math.sqrt
+_R2D = 180.0 / math.pi
+
 
 class BalanceController:
     """
     IMU-based balance controller for quadruped robot.
 
-    Uses MPU6050 accelerometer to measure pitch and roll,
+    Uses MPU6050 accelerometer + gyro (complementary filter) to measure pitch and roll,
     then calculates leg angle corrections to maintain balance.
     """
 
@@ -31,14 +58,21 @@ class BalanceController:
             address: I2C address of MPU6050 (default 0x68)
         """
         self.imu = None
+        self.bus = None
+        self.address = address
         self.simulation_mode = not MPU_AVAILABLE
+        # Serializes I2C reads and filter state between the gait loop and API readers
+        self._lock = threading.RLock()
 
         if MPU_AVAILABLE:
             try:
                 self.imu = mpu6050(address)
+                # Raw bus for block reads (mpu6050 lib does one transaction per register)
+                if SMBUS_AVAILABLE:
+                    self.bus = SMBus(1)
                 # Warmup reads - first read often returns zeros
                 for _ in range(3):
-                    self.imu.get_accel_data()
+                    self._read_imu_raw()
                     time.sleep(0.01)
                 print(f"MPU6050 initialized at 0x{address:02x}")
             except Exception as e:
@@ -48,18 +82,19 @@ class BalanceController:
         # Calibration offsets (set by calibrate())
         self.pitch_offset = 0.0
         self.roll_offset = 0.0
+        self.gyro_bias_x = 0.0  # °/s, subtracted before integrating
+        self.gyro_bias_y = 0.0
 
         # Control gains
         self.kp = 0.5  # Proportional gain for balance correction
         self.pitch_gain = 1.0  # Pitch sensitivity
         self.roll_gain = 1.0   # Roll sensitivity
+        self._recompute_coeffs()
 
-        # Filtering
-        self._last_pitch = 0.0
-        self._last_roll = 0.0
-        self._last_raw_pitch = 0.0  # Last valid raw reading (before filter)
+        # Filtering (complementary filter state, see _read_raw_angles)
+        self._last_raw_pitch = 0.0  # Last valid fused reading (before calibration offset)
         self._last_raw_roll = 0.0
-        self._alpha = 0.25  # Low-pass filter coefficient (0-1, higher = more responsive)
+        self._last_t = None  # Timestamp of last valid reading, None = seed from accel
 
     def calibrate(self, samples=30):
         """
@@ -76,26 +111,83 @@ class BalanceController:
             return
 
         print(f"Calibrating IMU with {samples} samples...")
-        pitch_sum = 0.0
-        roll_sum = 0.0
+        pitch_sum = roll_sum = gx_sum = gy_sum = 0.0
+        n = 0
+
+        with self._lock:
+            # Read back-to-back at the bus rate (no fixed sleep), bounded by a deadline
+            deadline = time.monotonic() + CALIBRATION_TIMEOUT
+            while n < samples and time.monotonic() < deadline:
+                try:
+                    reading = self._read_imu_raw()
+                except Exception as e:
+                    print(f"IMU read error: {e}")
+                    reading = None
+                if reading is not None:
+                    ax, ay, az, gx, gy = reading
+                    p, r = self._accel_angles(ax, ay, az)
+                    pitch_sum += p
+                    roll_sum += r
+                    gx_sum += gx
+                    gy_sum += gy
+                    n += 1
+
+        if n == 0:
+            print("Calibration failed: no samples read")
+            return
 
-        for i in range(samples):
-            try:
-                p, r = self._read_raw_angles()
-                pitch_sum += p
-                roll_sum += r
-                time.sleep(0.02)
-            except Exception as e:
-                print(f"Calibration sample {i} failed: {e}")
+        # Stationary robot: the mean gyro rate is pure bias, the mean accel angle is level
+        self.gyro_bias_x = gx_sum / n
+        self.gyro_bias_y = gy_sum / n
+        self.pitch_offset = pitch_sum / n
+        self.roll_offset = roll_sum / n
+        self._last_t = None  # Re-seed the filter from accel with the new bias
 
-        self.pitch_offset = pitch_sum / samples
-        self.roll_offset = roll_sum / samples
+        print(f"Calibrated: pitch_offset={self.pitch_offset:.2f}, roll_offset={self.roll_offset:.2f}, "
+              f"gyro_bias=({self.gyro_bias_x:.2f}, {self.gyro_bias_y:.2f})")
+
+    @staticmethod
+    def _accel_angles(ax, ay, az):
+        """
+        Pitch and roll (degrees) from the accelerometer alone.
+
+        Pitch: rotation around X axis (front/back tilt)
+        Roll: rotation around Z axis (left/right tilt)
+        """
+        return _atan2(ay, _sqrt(ax * ax + az * az)) * _R2D, _atan2(-ax, az) * _R2D
+
+    def _read_imu_raw(self):
+        """
+        Read accelerometer and gyro in a single 14-byte I2C block transaction.
+
+        Falls back to the mpu6050 library if smbus2 is not available.
+
+        MPU6050 sometimes returns all zeros - these bad readings return None.
+        A valid reading should have z ~= 9.8 (gravity) when level.
+
+        Returns:
+            Tuple of (ax, ay, az, gx, gy) - accel in m/s^2, gyro in °/s - or None
+        """
+        if self.bus is None:
+            accel = self.imu.get_accel_data()
+            if abs(accel['x']) < 0.01 and abs(accel['y']) < 0.01 and abs(accel['z']) < 0.01:
+                return None
+            gyro = self.imu.get_gyro_data()
+            return accel['x'], accel['y'], accel['z'], gyro['x'], gyro['y']
 
-        print(f"Calibrated: pitch_offset={self.pitch_offset:.2f}, roll_offset={self.roll_offset:.2f}")
+        data = self.bus.read_i2c_block_data(self.address, ACCEL_XOUT_H, 14)
+        ax, ay, az, _temp, gx, gy, _gz = struct.unpack('>hhhhhhh', bytes(data))
+        if (ax | ay | az) == 0:
+            return None
+        return (ax * ACCEL_SCALE, ay * ACCEL_SCALE, az * ACCEL_SCALE,
+                gx * GYRO_SCALE, gy * GYRO_SCALE)
 
     def _read_raw_angles(self):
         """
-        Read raw pitch and roll from accelerometer.
+        Read pitch and roll, fusing accelerometer and gyro with a complementary filter.
+
+        The gyro rate is integrated for responsiveness and the accelerometer angle
+        pulls the result back to prevent drift.
 
         Returns:
             Tuple of (pitch, roll) in degrees
@@ -103,31 +195,38 @@ class BalanceController:
         if self.simulation_mode or self.imu is None:
             return 0.0, 0.0
 
-        try:
-            accel = self.imu.get_accel_data()
-
-            # MPU6050 sometimes returns all zeros - ignore these bad readings
-            # A valid reading should have z ~= 9.8 (gravity) when level
-            if abs(accel['x']) < 0.01 and abs(accel['y']) < 0.01 and abs(accel['z']) < 0.01:
-                # Bad reading - return last known good values
+        with self._lock:
+            try:
+                reading = self._read_imu_raw()
+                if reading is None:
+                    # Bad (all-zero) reading - return last known good values
+                    return self._last_raw_pitch, self._last_raw_roll
+                ax, ay, az, gx, gy = reading
+
+                accel_pitch, accel_roll = self._accel_angles(ax, ay, az)
+
+                # Fuse with gyro: pitch rotates around X (gx), roll around Y (gy)
+                now = time.monotonic()
+                dt = now - self._last_t if self._last_t is not None else None
+                self._last_t = now
+                if dt is None or dt > COMP_FILTER_MAX_DT:
+                    pitch, roll = accel_pitch, accel_roll
+                else:
+                    alpha = COMP_FILTER_TAU / (COMP_FILTER_TAU + dt)
+                    pitch = (alpha * (self._last_raw_pitch + (gx - self.gyro_bias_x) * dt)
+                             + (1 - alpha) * accel_pitch)
+                    roll = (alpha * (self._last_raw_roll + (gy - self.gyro_bias_y) * dt)
+                            + (1 - alpha) * accel_roll)
+
+                # Store as last known good values
+                self._last_raw_pitch = pitch
+                self._last_raw_roll = roll
+
+                return pitch, roll
+            except Exception as e:
+                print(f"IMU read error: {e}")
                 return self._last_raw_pitch, self._last_raw_roll
 
-            # Calculate pitch and roll from accelerometer
-            # Pitch: rotation around X axis (front/back tilt)
-            # Roll: rotation around Z axis (left/right tilt)
-            pitch = math.atan2(accel['y'],
-                              math.sqrt(accel['x']**2 + accel['z']**2)) * 57.2958
-            roll = math.atan2(-accel['x'], accel['z']) * 57.2958
-
-            # Store as last known good values
-            self._last_raw_pitch = pitch
-            self._last_raw_roll = roll
-
-            return pitch, roll
-        except Exception as e:
-            print(f"IMU read error: {e}")
-            return self._last_raw_pitch, self._last_raw_roll
-
     def get_angles(self):
         """
         Get current pitch and roll angles (calibrated and filtered).
@@ -137,17 +236,10 @@ class BalanceController:
         """
         raw_pitch, raw_roll = self._read_raw_angles()
 
-        # Apply calibration offset
+        # Apply calibration offset (smoothing is done by the complementary filter)
         pitch = (raw_pitch - self.pitch_offset) * self.pitch_gain
         roll = (raw_roll - self.roll_offset) * self.roll_gain
 
-        # Low-pass filter for smoothing
-        pitch = self._alpha * pitch + (1 - self._alpha) * self._last_pitch
-        roll = self._alpha * roll + (1 - self._alpha) * self._last_roll
-
-        self._last_pitch = pitch
-        self._last_roll = roll
-
         return pitch, roll
 
     def get_correction(self):
@@ -159,23 +251,24 @@ class BalanceController:
             Positive = bend knee more, Negative = straighten knee
         """
         pitch, roll = self.get_angles()
+        return {leg: p * pitch + r * roll for leg, (p, r) in self._coeffs.items()}
 
-        # Calculate corrections based on body orientation
-        # If body tilts forward (positive pitch), front legs should extend, rear legs bend
-        # If body tilts right (positive roll), left legs should extend, right legs bend
-
-        corrections = {}
-
-        # Front legs
-        corrections['FL'] = -pitch * self.kp - roll * self.kp * 0.5
-        corrections['FR'] = -pitch * self.kp + roll * self.kp * 0.5
-
-        # Rear legs - NEGATIVE pitch correction (lift rear when tilting forward)
-        # 0.5 factor makes rear legs less aggressive than front
-        corrections['RL'] = -pitch * self.kp * 0.5 - roll * self.kp * 0.5
-        corrections['RR'] = -pitch * self.kp * 0.5 + roll * self.kp * 0.5
+    def _recompute_coeffs(self):
+        """
+        Precompute per-leg (pitch, roll) correction coefficients for the current kp.
 
-        return corrections
+        If body tilts forward (positive pitch), front legs should extend, rear legs bend.
+        If body tilts right (positive roll), left legs should extend, right legs bend.
+        Rear legs use a 0.5 pitch factor - less aggressive than front.
+        """
+        kp = self.kp
+        half = kp * 0.5
+        self._coeffs = {
+            'FL': (-kp, -half),
+            'FR': (-kp, half),
+            'RL': (-half, -half),
+            'RR': (-half, half),
+        }
 
     def set_kp(self, kp):
         """
@@ -185,6 +278,7 @@ class BalanceController:
             kp: Proportional gain (0.0 to 2.0 typical)
         """
         self.kp = max(0.0, min(2.0, kp))
+        self._recompute_coeffs()
         print(f"Balance Kp set to {self.kp}")
 
     def is_available(self):
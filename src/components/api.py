@@ -0,0 +1,299 @@
+"""Shared HTTP helpers for talking to the MicroSpot backend from Streamlit pages."""
+import json
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Prefer orjson (C-backed) for request/response bodies, fall back to stdlib json
+try:
+    import orjson
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj):
+        # Servo payloads are keyed by int channel
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj):
+        return json.dumps(obj).encode()
+
+# websockets (installed with uvicorn[standard]) lets pages take pushed IMU angles
+try:
+    from websockets.exceptions import WebSocketException
+    from websockets.sync.client import connect as ws_connect
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# (connect, read) used when a call does not pass its own timeout
+DEFAULT_TIMEOUT = (0.3, 1.0)
+
+
+class _Session(requests.Session):
+    """Session that applies DEFAULT_TIMEOUT unless the caller overrides it."""
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = DEFAULT_TIMEOUT
+        return super().request(method, url, **kwargs)
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Keep-alive session shared by all pages (cache_resource keeps it across reruns).
+
+    A failed connect is retried once for any method (nothing was sent yet). Read
+    errors and 502/503/504 are retried only for GET: POSTs here move servos or
+    start gait steps, so a timed-out POST must not be sent again.
+    """
+    session = _Session()
+    retry = Retry(total=2, connect=1, backoff_factor=0.1, status_forcelist=[502, 503, 504],
+                  allowed_methods={"GET"}, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_json(url: str, timeout=None):
+    """GET url and decode the JSON body."""
+    return loads(get_session().get(url, timeout=timeout).content)
+
+
+def post_json(url: str, obj=None, timeout: float = 0.5) -> requests.Response:
+    """POST obj as a JSON body (no body when obj is None)."""
+    if obj is None:
+        return get_session().post(url, timeout=timeout)
+    return get_session().post(url, data=dumps(obj), headers=_JSON_HEADERS, timeout=timeout)
+
+
+def cmd(method: str, url: str, *, json=None, ok_msg=None, invalidate=(), timeout=None) -> bool:
+    """Send a command through the shared session and report the outcome.
+
+    On {"status": "ok"} toasts ok_msg (if given), clears each cache in invalidate
+    and returns True; otherwise shows the error and returns False.
+    """
+    try:
+        if json is None:
+            resp = get_session().request(method, url, timeout=timeout)
+        else:
+            resp = get_session().request(method, url, data=dumps(json), headers=_JSON_HEADERS, timeout=timeout)
+        result = loads(resp.content)
+    except (requests.RequestException, ValueError) as e:
+        st.error(f"Error: {e}")
+        return False
+    if not isinstance(result, dict) or result.get("status") != "ok":
+        message = result.get("message", "Unknown error") if isinstance(result, dict) else result
+        st.error(f"Error: {message}")
+        return False
+    if ok_msg:
+        st.toast(ok_msg)
+    for cache in invalidate:
+        cache.clear()
+    return True
+
+
+@st.cache_data(ttl=0.5, show_spinner=False)
+def fetch_status(api_url: str) -> tuple:
+    """/api/status, shared by all reruns within the ttl.
+
+    Returns (ok, payload) on success or (False, error message) so pages can show it.
+    """
+    try:
+        return True, get_json(f"{api_url}/api/status")
+    except (requests.RequestException, ValueError) as e:
+        return False, str(e)
+
+
+@st.cache_data(ttl=0.5, show_spinner=False)
+def fetch_calibration(api_url: str) -> tuple:
+    """/api/calibration, shared by all reruns within the ttl; same (ok, payload) form."""
+    try:
+        return True, get_json(f"{api_url}/api/calibration")
+    except (requests.RequestException, ValueError) as e:
+        return False, str(e)
+
+
+@st.cache_resource
+def get_pool() -> ThreadPoolExecutor:
+    """Worker pool for fanning out per-servo requests (one worker per leg servo)."""
+    return ThreadPoolExecutor(max_workers=12)
+
+
+def post_many(calls, timeout: float = 0.5) -> list:
+    """POST several (url, json) pairs in parallel.
+
+    Used as fallback when the backend has no batch endpoint, so the wall time is
+    the slowest request instead of the sum of all of them.
+    Returns a list of booleans (request succeeded) in the same order as calls.
+    """
+    pool = get_pool()
+    futures = [pool.submit(post_json, url, payload, timeout) for url, payload in calls]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result().ok)
+        except requests.RequestException:
+            results.append(False)
+    return results
+
+
+def _get_ok(url: str, timeout):
+    resp = get_session().get(url, timeout=timeout)
+    return loads(resp.content) if resp.ok else None
+
+
+def get_later(url: str, timeout: float = 1):
+    """Start a GET on the worker pool so it overlaps with other work.
+
+    Returns a callable that waits for the decoded JSON body, or None if the
+    request failed or returned an error status.
+    """
+    future = get_pool().submit(_get_ok, url, timeout)
+
+    def result():
+        try:
+            return future.result()
+        except (requests.RequestException, ValueError):
+            return None
+    return result
+
+
+POLL_INTERVAL = 0.25   # background poll period while a page is reading
+POLL_IDLE_AFTER = 5.0  # stop polling when no fragment has read this long
+
+
+@st.cache_resource
+def start_poller(api_url: str, path: str = "/api/dashboard") -> dict:
+    """Poll api_url + path in a daemon thread and keep the latest JSON payload.
+
+    Returns the shared state dict: "data" (last payload), "updated" and "read"
+    (monotonic timestamps). Fragments read from it instead of blocking on HTTP.
+    When get_latest() has not been called for POLL_IDLE_AFTER no requests are made
+    until the next read.
+    """
+    state = {"data": None, "updated": 0.0, "read": time.monotonic()}
+
+    def idle():
+        return time.monotonic() - state["read"] > POLL_IDLE_AFTER
+
+    def run():
+        while True:
+            if not idle():
+                try:
+                    state["data"] = get_json(f"{api_url}{path}")
+                    state["updated"] = time.monotonic()
+                except (requests.RequestException, ValueError):
+                    pass
+            time.sleep(POLL_INTERVAL)
+
+    threading.Thread(target=run, daemon=True, name=f"poller{path}").start()
+    return state
+
+
+def get_latest(api_url: str, path: str = "/api/dashboard", max_age: float = 1.0) -> dict:
+    """Latest payload from the background poller, fetched directly if it is stale."""
+    state = start_poller(api_url, path)
+    now = time.monotonic()
+    state["read"] = now
+    if state["data"] is not None and now - state["updated"] < max_age:
+        return state["data"]
+    return get_json(f"{api_url}{path}")
+
+
+ANGLE_STREAM_MAX_AGE = 2.0   # the backend pushes at least once a second
+ANGLE_STREAM_RETRY = 2.0
+ANGLE_STREAM_IDLE_AFTER = 10.0  # close the socket when no page has read angles this long
+
+
+@st.cache_resource
+def start_angle_stream(api_url: str) -> dict:
+    """Subscribe to /ws/balance/angles in a daemon thread and keep the last frame.
+
+    Returns the shared state dict: "data" (last angles payload), "updated" and
+    "read" (monotonic timestamps). Reconnects after ANGLE_STREAM_RETRY if the socket
+    drops. When latest_angles() has not been called for ANGLE_STREAM_IDLE_AFTER the
+    socket is closed (so the backend stops sampling the IMU) until the next read.
+    """
+    state = {"data": None, "updated": 0.0, "read": time.monotonic()}
+    ws_url = "ws" + api_url[len("http"):] + "/ws/balance/angles"
+
+    def idle():
+        return time.monotonic() - state["read"] > ANGLE_STREAM_IDLE_AFTER
+
+    def run():
+        while True:
+            if not idle():
+                try:
+                    with ws_connect(ws_url, open_timeout=2) as ws:
+                        # The backend pushes at least once a second, so idleness is noticed
+                        for message in ws:
+                            state["data"] = loads(message)
+                            state["updated"] = time.monotonic()
+                            if idle():
+                                break
+                except (OSError, WebSocketException, ValueError):
+                    pass
+            time.sleep(ANGLE_STREAM_RETRY)
+
+    threading.Thread(target=run, daemon=True, name="angle-stream").start()
+    return state
+
+
+def latest_angles(api_url: str):
+    """Last pushed /api/balance/angles payload, or None if the stream is not live."""
+    if not WEBSOCKETS_AVAILABLE:
+        return None
+    state = start_angle_stream(api_url)
+    state["read"] = time.monotonic()
+    if state["data"] is not None and time.monotonic() - state["updated"] < ANGLE_STREAM_MAX_AGE:
+        return state["data"]
+    return None
+
+
+# Live fragment refresh: EWMA of per-tick pitch+roll change -> interval (s)
+FRAGMENT_MOTION_STEPS = (0.3, 1.0, 3.0)
+FRAGMENT_INTERVALS = (2.0, 1.0, 0.5, 0.25)
+FRAGMENT_HYSTERESIS = 0.25   # the EWMA must clear a band edge by 25% to switch
+FRAGMENT_MIN_DWELL = 5.0     # s to stay on an interval before switching again
+
+
+def adaptive_interval(name: str, pitch: float, roll: float) -> float:
+    """Refresh interval for a live fragment based on how much the IMU is moving.
+
+    Keeps the last angles and an EWMA of their change in st.session_state[name].
+    Starts at 0.5 s, backs off to 2 s when still and speeds up to 0.25 s in motion.
+    Changing the interval costs the caller a full rerun, so the band only changes
+    once the EWMA is clearly past an edge and the current one has held for a while.
+    """
+    state = st.session_state.setdefault(name, {"last": None, "ewma": 1.0, "band": 2, "since": 0.0})
+    last = state["last"]
+    if last is not None:
+        delta = abs(pitch - last[0]) + abs(roll - last[1])
+        state["ewma"] = 0.7 * state["ewma"] + 0.3 * delta
+    state["last"] = (pitch, roll)
+
+    ewma = state["ewma"]
+    band = state["band"]
+    target = bisect_right(FRAGMENT_MOTION_STEPS, ewma)
+    if target > band:
+        clear = ewma >= FRAGMENT_MOTION_STEPS[band] * (1 + FRAGMENT_HYSTERESIS)
+    else:
+        clear = target < band and ewma < FRAGMENT_MOTION_STEPS[band - 1] * (1 - FRAGMENT_HYSTERESIS)
+    now = time.monotonic()
+    if clear and now - state["since"] >= FRAGMENT_MIN_DWELL:
+        state["band"] = target
+        state["since"] = now
+    return FRAGMENT_INTERVALS[state["band"]]
@@ -1,50 +1,97 @@
-import streamlit as st
 import requests
+import streamlit as st
+from components.api import get_json, get_session, post_json, post_many
+import threading
 import time
 import traceback
+from contextlib import suppress
 
-def render_calibration(api_url):
-    st.title("Calibration")
+# "Alle Servo's" layout: (leg id, name, channels) and joint names per column
+_LEGS = (
+    ("FL", "Front Left", (0, 1, 2)),
+    ("FR", "Front Right", (3, 4, 5)),
+    ("RL", "Rear Left", (6, 7, 8)),
+    ("RR", "Rear Right", (9, 10, 11)),
+)
+_JOINTS = ("Hip", "Knee", "Ankle")
 
-    try:
-        resp = requests.get(f"{api_url}/api/calibration", timeout=2)
-        calib_data = resp.json()
-        servos = calib_data.get("servos", {})
-    except Exception as e:
-        st.error(f"Cannot connect to backend: {e}")
-        st.code(traceback.format_exc())
-        return
+# Per-channel strings and widget/state keys, built once
+_CH_STR = tuple(str(ch) for ch in range(12))
+_ALL_KEYS = tuple(f"all_servo_{ch}" for ch in range(12))
+_SLIDER_KEYS = tuple(f"slider_all_{ch}" for ch in range(12))
 
-    if not servos:
-        st.error("No servos in calibration data")
-        st.json(calib_data)
-        return
+SEND_DEBOUNCE_S = 0.15  # only the value that settles for this long is sent
 
-    # Servo selector
-    try:
-        options = [f"Ch{ch}: {s['label']}" for ch, s in servos.items() if int(ch) < 12]
-        if not options:
-            st.error("No valid servo options")
-            return
-        selected = st.selectbox("Select Servo", options)
-        channel = int(selected.split(":")[0].replace("Ch", ""))
-        servo = servos[str(channel)]
-    except Exception as e:
-        st.error(f"Error parsing servo options: {e}")
-        st.code(traceback.format_exc())
+
+def _sent_angles():
+    """Per-session {channel: angle the backend accepted}.
+
+    A plain dict rather than session_state keys, so the send timer threads can update it.
+    """
+    return st.session_state.setdefault("_sent_angles", {})
+
+
+def mark_sent(channel, angle):
+    """Remember the angle last sent to a channel; None forgets it."""
+    sent = _sent_angles()
+    if angle is None:
+        sent.pop(channel, None)
+    else:
+        sent[channel] = angle
+
+
+def send_debounced(api_url, channel, angle, timeout=0.5):
+    """Send a raw servo angle after a short quiet period.
+
+    Each new value cancels the pending send for the same channel, so a burst of
+    slider updates results in a single POST with the final value. Values equal to
+    the one the backend last accepted are skipped; a failed send is forgotten so
+    the same value can be retried.
+    """
+    timer_key = f"send_timer_{channel}"
+    pending = st.session_state.get(timer_key)
+    if pending is not None:
+        pending.cancel()
+
+    sent = _sent_angles()
+    if angle == sent.get(channel):
         return
 
-    st.caption(f"{servo['leg']} {servo['joint']} | Saved: {servo['neutral_angle']} | {'calibrated' if servo['calibrated'] else 'not calibrated'}")
+    def _post():
+        try:
+            ok = post_json(f"{api_url}/api/servo/{channel}", {"angle": angle, "raw": True}, timeout=timeout).ok
+        except requests.RequestException:
+            ok = False
+        if ok:
+            sent[channel] = angle
+        else:
+            sent.pop(channel, None)
+
+    timer = threading.Timer(SEND_DEBOUNCE_S, _post)
+    timer.daemon = True
+    st.session_state[timer_key] = timer
+    timer.start()
+
+
+@st.cache_data(ttl=2.0, show_spinner=False)
+def fetch_calib(api_url):
+    """Calibration payload, cached across reruns; cleared after every save."""
+    return get_json(f"{api_url}/api/calibration", timeout=2)
+
+
+@st.fragment
+def servo_control(api_url, channel, servo):
+    """Angle slider, fine tune, free move and goto for one servo.
+
+    Runs as a fragment so these controls rerun only this block, not the whole page.
+    """
+    session = get_session()
 
     # Session state key for this channel's angle
     angle_key = f"calib_angle_{channel}"
 
-    # Initialize with saved neutral if not set
-    if angle_key not in st.session_state:
-        st.session_state[angle_key] = servo.get("neutral_angle", 90)
-
-    # Current angle from session state
-    current_angle = st.session_state[angle_key]
+    # Current angle from session state (initialized with saved neutral)
+    current_angle = st.session_state.setdefault(angle_key, servo.get("neutral_angle", 90))
 
     # Slider
     try:
@@ -57,10 +104,7 @@ def render_calibration(api_url):
     # Update session state and send if slider changed
     if angle != current_angle:
         st.session_state[angle_key] = angle
-        try:
-            requests.post(f"{api_url}/api/servo/{channel}", json={"angle": angle, "raw": True}, timeout=0.5)
-        except Exception as e:
-            st.error(f"Failed to send servo command: {e}")
+        send_debounced(api_url, channel, angle)
 
     st.write(f"**{st.session_state[angle_key]}°** (offset: {st.session_state[angle_key]-90:+d} van midden)")
 
@@ -70,7 +114,8 @@ def render_calibration(api_url):
     def send_angle(new_angle):
         try:
             st.session_state[angle_key] = new_angle
-            requests.post(f"{api_url}/api/servo/{channel}", json={"angle": new_angle, "raw": True}, timeout=0.5)
+            post_json(f"{api_url}/api/servo/{channel}", {"angle": new_angle, "raw": True}, timeout=0.5)
+            mark_sent(channel, new_angle)
             return True
         except Exception as e:
             st.error(f"Send failed: {e}")
@@ -79,19 +124,19 @@ def render_calibration(api_url):
     with c1:
         if st.button("-5", key=f"m5_{channel}"):
             if send_angle(max(0, st.session_state[angle_key] - 5)):
-                st.rerun()
+                st.rerun(scope="fragment")
     with c2:
         if st.button("-1", key=f"m1_{channel}"):
             if send_angle(max(0, st.session_state[angle_key] - 1)):
-                st.rerun()
+                st.rerun(scope="fragment")
     with c3:
         if st.button("+1", key=f"p1_{channel}"):
             if send_angle(min(180, st.session_state[angle_key] + 1)):
-                st.rerun()
+                st.rerun(scope="fragment")
     with c4:
         if st.button("+5", key=f"p5_{channel}"):
             if send_angle(min(180, st.session_state[angle_key] + 5)):
-                st.rerun()
+                st.rerun(scope="fragment")
 
     st.divider()
 
@@ -107,8 +152,9 @@ def render_calibration(api_url):
     with free_col1:
         if st.button("🔓 Vrijgeven", key=f"free_{channel}", use_container_width=True):
             try:
-                resp = requests.post(f"{api_url}/api/servo/{channel}/disable", timeout=2)
+                resp = session.post(f"{api_url}/api/servo/{channel}/disable", timeout=2)
                 if resp.status_code == 200:
+                    mark_sent(channel, None)  # next angle must re-engage the servo
                     st.success("Servo vrij! Beweeg met de hand.")
                 else:
                     st.error(f"Failed: {resp.status_code}")
@@ -119,70 +165,96 @@ def render_calibration(api_url):
         if st.button("🔒 Naar 90°", key=f"lock_{channel}", use_container_width=True):
             if send_angle(90):
                 st.success("Servo op 90°")
-                st.rerun()
+                st.rerun(scope="fragment")
 
     st.divider()
 
-    # Save and goto
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button(f"Goto saved ({servo['neutral_angle']})", key=f"goto_{channel}"):
-            try:
-                st.session_state[angle_key] = servo['neutral_angle']
-                requests.post(f"{api_url}/api/servo/{channel}", json={"angle": servo['neutral_angle'], "raw": True}, timeout=0.5)
-                st.rerun()
-            except Exception as e:
-                st.error(f"Goto failed: {e}")
+    if st.button(f"Goto saved ({servo['neutral_angle']})", key=f"goto_{channel}"):
+        try:
+            st.session_state[angle_key] = servo['neutral_angle']
+            post_json(f"{api_url}/api/servo/{channel}", {"angle": servo['neutral_angle'], "raw": True}, timeout=0.5)
+            mark_sent(channel, servo['neutral_angle'])
+            st.rerun(scope="fragment")
+        except Exception as e:
+            st.error(f"Goto failed: {e}")
 
-    with col2:
-        if st.button("SAVE", type="primary", key=f"save_{channel}"):
-            try:
-                save_angle = st.session_state[angle_key]
-                servo["neutral_angle"] = save_angle
-                servo["offset"] = save_angle - 90  # 90 = midden van 180° range
-                servo["calibrated"] = True
 
-                requests.post(f"{api_url}/api/calibration/servo/{channel}", json=servo, timeout=2)
-                requests.post(f"{api_url}/api/calibration/save", timeout=2)
+def render_calibration(api_url):
+    st.title("Calibration")
+    session = get_session()
 
-                st.success(f"Saved {save_angle}!")
-                time.sleep(0.5)
-                st.rerun()
-            except Exception as e:
-                st.error(f"Save failed: {e}")
-                st.code(traceback.format_exc())
+    try:
+        calib_data = fetch_calib(api_url)
+        servos = calib_data.get("servos", {})
+    except Exception as e:
+        st.error(f"Cannot connect to backend: {e}")
+        st.code(traceback.format_exc())
+        return
+
+    if not servos:
+        st.error("No servos in calibration data")
+        st.json(calib_data)
+        return
+
+    # Servo selector
+    try:
+        options = [f"Ch{ch}: {s['label']}" for ch, s in servos.items() if int(ch) < 12]
+        if not options:
+            st.error("No valid servo options")
+            return
+        selected = st.selectbox("Select Servo", options)
+        channel = int(selected.split(":")[0].replace("Ch", ""))
+        servo = servos[str(channel)]
+    except Exception as e:
+        st.error(f"Error parsing servo options: {e}")
+        st.code(traceback.format_exc())
+        return
+
+    st.caption(f"{servo['leg']} {servo['joint']} | Saved: {servo['neutral_angle']} | {'calibrated' if servo['calibrated'] else 'not calibrated'}")
+
+    servo_control(api_url, channel, servo)
+    angle_key = f"calib_angle_{channel}"
 
     st.divider()
 
-    # === ALL SERVOS SLIDERS ===
-    st.subheader("Alle Servo's (Raw)")
+    if st.button("SAVE", type="primary", key=f"save_{channel}"):
+        try:
+            save_angle = st.session_state[angle_key]
+            servo["neutral_angle"] = save_angle
+            servo["offset"] = save_angle - 90  # 90 = midden van 180° range
+            servo["calibrated"] = True
+
+            post_json(f"{api_url}/api/calibration/servo/{channel}", servo, timeout=2)
+            session.post(f"{api_url}/api/calibration/save", timeout=2)
+            fetch_calib.clear()
 
-    # Per leg layout
-    legs = [
-        ("FL", "Front Left", [0, 1, 2]),
-        ("FR", "Front Right", [3, 4, 5]),
-        ("RL", "Rear Left", [6, 7, 8]),
-        ("RR", "Rear Right", [9, 10, 11]),
-    ]
+            st.success(f"Saved {save_angle}!")
+            time.sleep(0.5)
+            st.rerun()
+        except Exception as e:
+            st.error(f"Save failed: {e}")
+            st.code(traceback.format_exc())
+
+    st.divider()
 
-    joints = ["Hip", "Knee", "Ankle"]
+    # === ALL SERVOS SLIDERS ===
+    st.subheader("Alle Servo's (Raw)")
 
-    for leg_id, leg_name, channels in legs:
+    for leg_id, leg_name, channels in _LEGS:
         st.markdown(f"**{leg_name}**")
         cols = st.columns(3)
 
         for idx, ch in enumerate(channels):
-            ch_str = str(ch)
+            ch_str = _CH_STR[ch]
             if ch_str not in servos:
                 continue
 
             s = servos[ch_str]
-            joint = joints[idx]
+            joint = _JOINTS[idx]
 
             # Session state for this servo
-            key = f"all_servo_{ch}"
-            if key not in st.session_state:
-                st.session_state[key] = s.get("neutral_angle", 90)
+            key = _ALL_KEYS[ch]
+            current = st.session_state.setdefault(key, s.get("neutral_angle", 90))
 
             with cols[idx]:
                 st.caption(f"{joint} (ch{ch})")
@@ -191,18 +263,15 @@ def render_calibration(api_url):
                 new_val = st.slider(
                     f"ch{ch}",
                     0, 180,
-                    int(st.session_state[key]),
-                    key=f"slider_all_{ch}",
+                    int(current),
+                    key=_SLIDER_KEYS[ch],
                     label_visibility="collapsed"
                 )
 
                 # Send if changed
-                if new_val != st.session_state[key]:
+                if new_val != current:
                     st.session_state[key] = new_val
-                    try:
-                        requests.post(f"{api_url}/api/servo/{ch}", json={"angle": new_val, "raw": True}, timeout=0.3)
-                    except:
-                        pass
+                    send_debounced(api_url, ch, new_val, timeout=0.3)
 
                 # Show value and offset (90 = midden/neutral)
                 offset = new_val - 90
@@ -215,23 +284,26 @@ def render_calibration(api_url):
 
     with col1:
         if st.button("Midden (90°)", key="all_90"):
-            for ch in range(12):
-                try:
-                    requests.post(f"{api_url}/api/servo/{ch}", json={"angle": 90, "raw": True}, timeout=0.3)
-                    st.session_state[f"all_servo_{ch}"] = 90
-                except:
-                    pass
+            with suppress(requests.RequestException):
+                resp = post_json(f"{api_url}/api/servo/batch",
+                                 {"angles": {ch: 90 for ch in range(12)}, "raw": True}, timeout=1)
+                if not resp.ok:  # older backend without batch endpoint
+                    post_many([(f"{api_url}/api/servo/{ch}", {"angle": 90, "raw": True}) for ch in range(12)])
+                for ch, key in enumerate(_ALL_KEYS):
+                    st.session_state[key] = 90
+                    mark_sent(ch, 90)
             st.rerun()
 
     with col2:
         if st.button("All to neutrals", key="all_neutrals"):
             try:
-                requests.post(f"{api_url}/api/goto_neutrals", timeout=5)
+                session.post(f"{api_url}/api/goto_neutrals", timeout=5)
                 # Update session state to match saved neutrals
                 for ch_str, s in servos.items():
                     ch = int(ch_str)
                     if ch < 12:
-                        st.session_state[f"all_servo_{ch}"] = s.get("neutral_angle", 90)
+                        st.session_state[_ALL_KEYS[ch]] = s.get("neutral_angle", 90)
+                        mark_sent(ch, s.get("neutral_angle", 90))
                 st.rerun()
             except Exception as e:
                 st.error(f"Failed: {e}")
@@ -239,16 +311,21 @@ def render_calibration(api_url):
     with col3:
         if st.button("Save ALL", type="primary", key="save_all"):
             try:
-                for ch in range(12):
-                    ch_str = str(ch)
+                for ch, ch_str in enumerate(_CH_STR):
                     if ch_str in servos:
-                        new_angle = st.session_state.get(f"all_servo_{ch}", servos[ch_str].get("neutral_angle", 90))
+                        new_angle = st.session_state.get(_ALL_KEYS[ch], servos[ch_str].get("neutral_angle", 90))
                         servos[ch_str]["neutral_angle"] = new_angle
                         servos[ch_str]["offset"] = new_angle - 90  # 90 = midden van 180° range
                         servos[ch_str]["calibrated"] = True
-                        requests.post(f"{api_url}/api/calibration/servo/{ch}", json=servos[ch_str], timeout=1)
 
-                requests.post(f"{api_url}/api/calibration/save", timeout=2)
+                # One request updates all servos and saves the file once
+                batch = {ch_str: s for ch_str, s in servos.items() if int(ch_str) < 12}
+                resp = post_json(f"{api_url}/api/calibration/batch", {"servos": batch}, timeout=2)
+                if not resp.ok:  # older backend without batch endpoint
+                    post_many([(f"{api_url}/api/calibration/servo/{ch_str}", s) for ch_str, s in batch.items()],
+                              timeout=1)
+                    session.post(f"{api_url}/api/calibration/save", timeout=2)
+                fetch_calib.clear()
                 st.success("All saved!")
                 time.sleep(0.5)
                 st.rerun()
@@ -1,35 +1,72 @@
 """Control page - Main control interface combining walking, poses, and safety."""
-import streamlit as st
 import requests
-import numpy as np
-from math import radians
+import streamlit as st
+from components.api import adaptive_interval, get_json, get_latest, get_session, post_many
+from contextlib import suppress
+from functools import lru_cache
+from math import degrees, radians
+
+
+_STATUS_BAR = """
+<div style="background-color:{color};color:white;padding:8px 16px;border-radius:8px;
+            display:flex;justify-content:space-between;align-items:center;margin-bottom:1rem;">
+    <span style="font-weight:bold;">{label}</span>
+    <span>Pitch: {pitch:.1f} | Roll: {roll:.1f}</span>
+    <span>{gait} | Balance: {balance}</span>
+</div>
+"""
+
+
+STATE_COLORS = {
+    "stable": ("#22c55e", "STABLE"),
+    "warning": ("#f59e0b", "WARNING"),
+    "critical": ("#ef4444", "CRITICAL"),
+    "emergency": ("#dc2626", "EMERGENCY")
+}
+
+
+@lru_cache(maxsize=128)
+def _stability_for_tilt(tilt_deg: int) -> tuple:
+    """Stability state for a whole-degree tilt (thresholds are whole degrees too)."""
+    if tilt_deg < 10:
+        state, desc = "stable", "Robot is stable"
+    elif tilt_deg < 25:
+        state, desc = "warning", "Moderate tilt"
+    elif tilt_deg < 35:
+        state, desc = "critical", "High tilt!"
+    else:
+        state, desc = "emergency", "EXTREME TILT!"
+    color, label = STATE_COLORS[state]
+    return state, desc, color, label
 
 
 def get_stability_state(pitch: float, roll: float) -> tuple:
-    """Determine stability state based on pitch and roll angles."""
-    max_tilt = max(abs(pitch), abs(roll))
-    if max_tilt < 10:
-        return "stable", "Robot is stable"
-    elif max_tilt < 25:
-        return "warning", "Moderate tilt"
-    elif max_tilt < 35:
-        return "critical", "High tilt!"
-    else:
-        return "emergency", "EXTREME TILT!"
+    """Determine stability state based on pitch and roll angles.
+
+    Returns (state, description, color, label).
+    """
+    # Truncating the non-negative tilt keeps the integer thresholds exact
+    return _stability_for_tilt(int(max(abs(pitch), abs(roll))))
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def robot_figure(angles_key: tuple, pitch: float, roll: float, height: int):
+    """3D robot figure for rounded (channel, angle) pairs, cached between live ticks."""
+    from components.robot_3d import create_3d_robot
+    return create_3d_robot(dict(angles_key), pitch, roll, height=height)
 
 
 def render_control_page(api_url: str):
     st.title("Control")
+    session = get_session()
 
     # Initialize session state for auto-refresh
-    if "control_live" not in st.session_state:
-        st.session_state.control_live = False
+    st.session_state.setdefault("control_live", False)
 
     # Initial data fetch for controls that need it
     try:
-        gait = requests.get(f"{api_url}/api/gait/status", timeout=1).json()
-        bal = requests.get(f"{api_url}/api/balance/status", timeout=1).json()
-        status = requests.get(f"{api_url}/api/status", timeout=1).json()
+        dashboard = get_json(f"{api_url}/api/dashboard")
+        gait, bal, status = dashboard["gait"], dashboard["balance"], dashboard["status"]
         connected = True
     except Exception:
         st.error("Cannot connect to backend")
@@ -41,14 +78,15 @@ def render_control_page(api_url: str):
     body = status.get("body", {})
 
     # Real-time status bar and visualization
-    @st.fragment(run_every=0.5 if st.session_state.control_live else None)
+    interval = st.session_state.setdefault("control_interval", 0.5)
+
+    @st.fragment(run_every=interval if st.session_state.control_live else None)
     def status_fragment():
         """Real-time status updates."""
         try:
-            ang = requests.get(f"{api_url}/api/balance/angles", timeout=1).json()
-            gait_status = requests.get(f"{api_url}/api/gait/status", timeout=1).json()
-            bal_status = requests.get(f"{api_url}/api/balance/status", timeout=1).json()
-            current_status = requests.get(f"{api_url}/api/status", timeout=1).json()
+            data = get_latest(api_url)
+            ang, gait_status = data["angles"], data["gait"]
+            bal_status, current_status = data["balance"], data["status"]
         except Exception:
             ang = {"pitch": 0, "roll": 0}
             gait_status = {"running": False}
@@ -57,33 +95,37 @@ def render_control_page(api_url: str):
 
         pitch = ang.get("pitch", 0)
         roll = ang.get("roll", 0)
+
+        # run_every is fixed per full run, so a new rate needs one full rerun
+        if st.session_state.control_live:
+            new_interval = adaptive_interval("_control_motion", pitch, roll)
+            if new_interval != st.session_state.control_interval:
+                st.session_state.control_interval = new_interval
+                st.rerun()
         is_running = gait_status.get("running", False)
         is_bal_on = bal_status.get("enabled", False)
 
         # Safety status bar
-        state, state_desc = get_stability_state(pitch, roll)
-        state_colors = {
-            "stable": ("#22c55e", "STABLE"),
-            "warning": ("#f59e0b", "WARNING"),
-            "critical": ("#ef4444", "CRITICAL"),
-            "emergency": ("#dc2626", "EMERGENCY")
-        }
-        color, label = state_colors.get(state, ("#666", "UNKNOWN"))
-
-        st.markdown(f"""
-        <div style="background-color:{color};color:white;padding:8px 16px;border-radius:8px;
-                    display:flex;justify-content:space-between;align-items:center;margin-bottom:1rem;">
-            <span style="font-weight:bold;">{label}</span>
-            <span>Pitch: {pitch:.1f} | Roll: {roll:.1f}</span>
-            <span>{'Walking' if is_running else 'Stopped'} | Balance: {'ON' if is_bal_on else 'OFF'}</span>
-        </div>
-        """, unsafe_allow_html=True)
+        state, state_desc, color, label = get_stability_state(pitch, roll)
+
+        # Rebuild the status bar HTML only when what it shows has changed
+        bar_key = (color, label, round(pitch, 1), round(roll, 1), is_running, is_bal_on)
+        cached_bar = st.session_state.get("_status_bar")
+        if cached_bar is None or cached_bar[0] != bar_key:
+            html = _STATUS_BAR.format(
+                color=color, label=label, pitch=pitch, roll=roll,
+                gait='Walking' if is_running else 'Stopped',
+                balance='ON' if is_bal_on else 'OFF',
+            )
+            cached_bar = (bar_key, html)
+            st.session_state["_status_bar"] = cached_bar
+        st.markdown(cached_bar[1], unsafe_allow_html=True)
 
         # 3D Robot visualization
         try:
-            from components.robot_3d import create_3d_robot
             servo_angles = current_status.get("angles", {})
-            fig = create_3d_robot(servo_angles, pitch, roll, height=400)
+            angles_key = tuple(sorted((str(ch), round(a)) for ch, a in servo_angles.items()))
+            fig = robot_figure(angles_key, round(pitch, 1), round(roll, 1), 400)
             st.plotly_chart(fig, use_container_width=True, key="robot_3d_live")
         except Exception as e:
             st.error(f"3D visualization error: {e}")
@@ -105,15 +147,15 @@ def render_control_page(api_url: str):
         c1, c2, c3 = st.columns(3)
         with c1:
             if st.button("Walk", use_container_width=True, disabled=running):
-                requests.post(f"{api_url}/api/gait/start", json={"direction": "forward"})
+                session.post(f"{api_url}/api/gait/start", json={"direction": "forward"}, timeout=2)
                 st.rerun()
         with c2:
             if st.button("STOP", use_container_width=True, type="primary"):
-                requests.post(f"{api_url}/api/gait/stop")
+                session.post(f"{api_url}/api/gait/stop", timeout=2)
                 st.rerun()
         with c3:
             if st.button("Step", use_container_width=True):
-                requests.post(f"{api_url}/api/gait/step")
+                session.post(f"{api_url}/api/gait/step", timeout=5)  # blocks for a full cycle
                 st.rerun()
 
         # Balance toggle
@@ -121,11 +163,11 @@ def render_control_page(api_url: str):
         with bal_col1:
             if st.button("Balance ON" if not bal_on else "Balance OFF",
                         use_container_width=True, disabled=not imu_available):
-                requests.post(f"{api_url}/api/balance/enable", json={"enable": not bal_on})
+                session.post(f"{api_url}/api/balance/enable", json={"enable": not bal_on}, timeout=2)
                 st.rerun()
         with bal_col2:
             if st.button("Cal IMU", use_container_width=True, disabled=not imu_available):
-                requests.post(f"{api_url}/api/balance/calibrate")
+                session.post(f"{api_url}/api/balance/calibrate", timeout=5)
                 st.rerun()
 
         st.divider()
@@ -137,7 +179,7 @@ def render_control_page(api_url: str):
         for idx, pose in enumerate(poses):
             with pose_cols[idx]:
                 if st.button(pose.title(), use_container_width=True):
-                    requests.post(f"{api_url}/api/pose/{pose}")
+                    session.post(f"{api_url}/api/pose/{pose}", timeout=5)
                     st.rerun()
 
     st.divider()
@@ -157,18 +199,16 @@ def render_control_page(api_url: str):
             with hcols[i]:
                 if st.button(f"{h}", key=f"h{h}"):
                     height = h
-                    try:
+                    with suppress(requests.RequestException):
                         data = {"y": height / 1000.0, "phi": 0, "theta": 0, "psi": 0}
-                        requests.post(f"{api_url}/api/body", json=data, timeout=2)
+                        session.post(f"{api_url}/api/body", json=data, timeout=2)
                         st.rerun()
-                    except Exception:
-                        pass
 
     with col_angles:
         st.write("**Orientation**")
-        phi = st.slider("Roll", -30.0, 30.0, float(np.degrees(body.get('phi', 0))), 1.0,
+        phi = st.slider("Roll", -30.0, 30.0, degrees(body.get('phi', 0)), 1.0,
                        key="phi_slider")
-        theta = st.slider("Pitch", -30.0, 30.0, float(np.degrees(body.get('theta', 0))), 1.0,
+        theta = st.slider("Pitch", -30.0, 30.0, degrees(body.get('theta', 0)), 1.0,
                          key="theta_slider")
 
     # Apply body state
@@ -181,13 +221,13 @@ def render_control_page(api_url: str):
                 "theta": radians(theta),
                 "psi": 0
             }
-            requests.post(f"{api_url}/api/body", json=data, timeout=2)
+            session.post(f"{api_url}/api/body", json=data, timeout=2)
             st.rerun()
 
     with col_reset:
         if st.button("Reset Body", use_container_width=True):
             data = {"y": 0.14, "phi": 0, "theta": 0, "psi": 0}
-            requests.post(f"{api_url}/api/body", json=data, timeout=2)
+            session.post(f"{api_url}/api/body", json=data, timeout=2)
             st.rerun()
 
     st.divider()
@@ -198,20 +238,25 @@ def render_control_page(api_url: str):
 
     with e1:
         if st.button("EMERGENCY STOP", type="primary", use_container_width=True):
-            requests.post(f"{api_url}/api/gait/stop", timeout=2)
-            for channel in range(12):
-                try:
-                    requests.post(f"{api_url}/api/servo/{channel}/disable", timeout=0.5)
-                except Exception:
-                    pass
+            # A failed gait stop must not keep the servos from being disabled
+            with suppress(requests.RequestException):
+                session.post(f"{api_url}/api/gait/stop", timeout=2)
+            try:
+                resp = session.post(f"{api_url}/api/servo/batch/disable", json={"channels": list(range(12))}, timeout=2)
+                batch_ok = resp.ok
+            except Exception:
+                batch_ok = False
+            if not batch_ok:
+                # Fall back to per-servo disables, fired in parallel
+                post_many([(f"{api_url}/api/servo/{channel}/disable", None) for channel in range(12)])
             st.warning("All servos disabled!")
 
     with e2:
         if st.button("Rest Pose", use_container_width=True):
-            requests.post(f"{api_url}/api/gait/stop", timeout=2)
-            requests.post(f"{api_url}/api/pose/rest", timeout=2)
+            session.post(f"{api_url}/api/gait/stop", timeout=2)
+            session.post(f"{api_url}/api/pose/rest", timeout=2)
 
     with e3:
         if st.button("Neutral Pose", use_container_width=True):
-            requests.post(f"{api_url}/api/gait/stop", timeout=2)
-            requests.post(f"{api_url}/api/pose/neutral", timeout=2)
+            session.post(f"{api_url}/api/gait/stop", timeout=2)
+            session.post(f"{api_url}/api/pose/neutral", timeout=2)
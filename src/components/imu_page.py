@@ -1,59 +1,68 @@
 """IMU page - IMU monitor and balance visualization with real-time updates."""
+from bisect import bisect_right
+
 import streamlit as st
-import requests
+from components.api import adaptive_interval, get_latest, get_session
 import time
 from components.robot_viz import create_robot_svg, create_side_svg, create_front_svg
 
 
+# ASCII view template: labels around an 11x21 grid with center cross (center = 10,5)
+_ASCII_PREFIX = """
+     ROLL
+  -30   0   +30
+    <   |   >
+"""
+_ASCII_SUFFIX = """
+    ^   0   v
+  -30      +30
+     PITCH
+"""
+_ASCII_ROW = 22  # 21 grid columns + newline
+_ASCII_TEMPLATE = (
+    _ASCII_PREFIX
+    + '\n'.join('-' * 10 + '+' + '-' * 10 if row == 5 else ' ' * 10 + '|' + ' ' * 10 for row in range(11))
+    + _ASCII_SUFFIX
+).encode('ascii')
+_ASCII_GRID_START = len(_ASCII_PREFIX)
+
+
+# Reuse the rendered SVGs while pitch/roll move less than this (degrees)
+SVG_REUSE_DEG = 0.3
+
+_BANNER = "{label} | Pitch: {pitch:.1f} | Roll: {roll:.1f} | Balance: {balance}"
+
+# Tilt bands: < 10 level, < 25 tilted, otherwise excessive
+_TILT_BANDS = (10, 25)
+_TILT_TAGS = (("success", "LEVEL"), ("warning", "TILTED"), ("error", "EXCESSIVE TILT"))
+
+
 def create_ascii_viz(pitch: float, roll: float) -> str:
     """Create ASCII visualization of robot orientation."""
     p = max(-30, min(30, pitch))
     r = max(-30, min(30, roll))
 
-    grid = [[' ' for _ in range(21)] for _ in range(11)]
-
-    # Center cross
-    for i in range(21):
-        grid[5][i] = '-'
-    for i in range(11):
-        grid[i][10] = '|'
-    grid[5][10] = '+'
-
     # Robot position (center = 10,5)
     rx = 10 + int(r / 3)
     ry = 5 + int(p / 6)
     rx = max(1, min(19, rx))
     ry = max(1, min(9, ry))
 
-    grid[ry][rx] = 'O'
-
-    lines = [''.join(row) for row in grid]
-
-    # Create the visualization with labels
-    viz = """
-     ROLL
-  -30   0   +30
-    <   |   >
-"""
-    viz += '\n'.join(lines)
-    viz += """
-    ^   0   v
-  -30      +30
-     PITCH
-"""
-    return viz
+    buf = bytearray(_ASCII_TEMPLATE)
+    buf[_ASCII_GRID_START + ry * _ASCII_ROW + rx] = ord('O')
+    return buf.decode('ascii')
 
 
 def render_imu_page(api_url: str):
     st.title("IMU Monitor")
+    session = get_session()
 
     # Initialize session state for live mode (default ON)
-    if "imu_live" not in st.session_state:
-        st.session_state.imu_live = True
+    st.session_state.setdefault("imu_live", True)
 
     # Check IMU availability once at page load
     try:
-        status = requests.get(f"{api_url}/api/balance/status", timeout=2).json()
+        status = session.get(f"{api_url}/api/balance/status", timeout=2).json()
         available = status.get("available", False)
         enabled = status.get("enabled", False)
 
@@ -70,7 +79,7 @@ def render_imu_page(api_url: str):
     with col1:
         if st.button("Calibrate", use_container_width=True):
             try:
-                requests.post(f"{api_url}/api/balance/calibrate", timeout=5)
+                session.post(f"{api_url}/api/balance/calibrate", timeout=5)
                 st.success("Calibrated!")
                 time.sleep(0.5)
                 st.rerun()
@@ -81,7 +90,7 @@ def render_imu_page(api_url: str):
         label = "Balance OFF" if enabled else "Balance ON"
         if st.button(label, use_container_width=True, type="primary" if not enabled else "secondary"):
             try:
-                requests.post(f"{api_url}/api/balance/enable", json={"enable": not enabled}, timeout=2)
+                session.post(f"{api_url}/api/balance/enable", json={"enable": not enabled}, timeout=2)
                 st.rerun()
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -99,42 +108,53 @@ def render_imu_page(api_url: str):
     st.divider()
 
     # Real-time data display - always poll when live is enabled
-    @st.fragment(run_every=0.5 if st.session_state.imu_live else None)
+    interval = st.session_state.setdefault("imu_interval", 0.5)
+
+    @st.fragment(run_every=interval if st.session_state.imu_live else None)
     def imu_data_fragment():
         """Fragment that updates IMU data in real-time."""
-        # Get current angles
+        # Latest angles and balance status from the background poller
         try:
-            angles = requests.get(f"{api_url}/api/balance/angles", timeout=1).json()
-            pitch = angles.get("pitch", 0)
-            roll = angles.get("roll", 0)
+            data = get_latest(api_url)
+            pitch = data["angles"].get("pitch", 0)
+            roll = data["angles"].get("roll", 0)
+            bal_enabled = data["balance"].get("enabled", False)
         except Exception:
             pitch, roll = 0, 0
-
-        # Get current balance status
-        try:
-            bal_status = requests.get(f"{api_url}/api/balance/status", timeout=1).json()
-            bal_enabled = bal_status.get("enabled", False)
-        except Exception:
             bal_enabled = False
 
+        # run_every is fixed per full run, so a new rate needs one full rerun
+        if st.session_state.imu_live:
+            new_interval = adaptive_interval("_imu_motion", pitch, roll)
+            if new_interval != st.session_state.imu_interval:
+                st.session_state.imu_interval = new_interval
+                st.rerun()
+
         # Status banner (thresholds increased to reduce noise sensitivity)
         tilt = max(abs(pitch), abs(roll))
-        if tilt < 10:
-            st.success(f"LEVEL | Pitch: {pitch:.1f} | Roll: {roll:.1f} | Balance: {'ON' if bal_enabled else 'OFF'}")
-        elif tilt < 25:
-            st.warning(f"TILTED | Pitch: {pitch:.1f} | Roll: {roll:.1f} | Balance: {'ON' if bal_enabled else 'OFF'}")
+        balance = 'ON' if bal_enabled else 'OFF'
+        fn_name, label = _TILT_TAGS[bisect_right(_TILT_BANDS, tilt)]
+        getattr(st, fn_name)(_BANNER.format(label=label, pitch=pitch, roll=roll, balance=balance))
+
+        # Only regenerate the SVGs when the orientation moved noticeably
+        last = st.session_state.get("_imu_last")
+        if last is not None and abs(pitch - last[0]) < SVG_REUSE_DEG and abs(roll - last[1]) < SVG_REUSE_DEG:
+            robot_svg, side_svg, front_svg = last[2]
         else:
-            st.error(f"EXCESSIVE TILT | Pitch: {pitch:.1f} | Roll: {roll:.1f} | Balance: {'ON' if bal_enabled else 'OFF'}")
+            robot_svg = create_robot_svg(pitch, roll, 320, 320)
+            side_svg = create_side_svg(pitch, 200, 120)
+            front_svg = create_front_svg(roll, 200, 120)
+            st.session_state["_imu_last"] = (pitch, roll, (robot_svg, side_svg, front_svg))
 
         # Main visualization
         col_viz, col_side = st.columns([2, 1])
 
         with col_viz:
-            st.markdown(create_robot_svg(pitch, roll, 320, 320), unsafe_allow_html=True)
+            st.markdown(robot_svg, unsafe_allow_html=True)
 
         with col_side:
-            st.markdown(create_side_svg(pitch, 200, 120), unsafe_allow_html=True)
-            st.markdown(create_front_svg(roll, 200, 120), unsafe_allow_html=True)
+            st.markdown(side_svg, unsafe_allow_html=True)
+            st.markdown(front_svg, unsafe_allow_html=True)
 
             # Metrics with delta
             col_m1, col_m2 = st.columns(2)
@@ -159,7 +179,7 @@ def render_imu_page(api_url: str):
 
     # Get current tuning
     try:
-        response = requests.get(f"{api_url}/api/tuning", timeout=2)
+        response = session.get(f"{api_url}/api/tuning", timeout=2)
         if response.ok:
             tuning = response.json()
             current_kp = tuning.get("balance_kp", 0.5)
@@ -182,8 +202,8 @@ def render_imu_page(api_url: str):
     with col_save:
         if st.button("Save Gain", use_container_width=True, type="primary"):
             try:
-                requests.post(f"{api_url}/api/tuning/balance_kp", json={"value": new_kp}, timeout=2)
-                requests.post(f"{api_url}/api/balance/kp", json={"kp": new_kp}, timeout=2)
+                session.post(f"{api_url}/api/tuning/balance_kp", json={"value": new_kp}, timeout=2)
+                session.post(f"{api_url}/api/balance/kp", json={"kp": new_kp}, timeout=2)
                 st.success(f"Balance Kp saved: {new_kp}")
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -191,7 +211,7 @@ def render_imu_page(api_url: str):
     with col_apply:
         if st.button("Apply (no save)", use_container_width=True):
             try:
-                requests.post(f"{api_url}/api/balance/kp", json={"kp": new_kp}, timeout=2)
+                session.post(f"{api_url}/api/balance/kp", json={"kp": new_kp}, timeout=2)
                 st.info(f"Kp temporarily set to {new_kp}")
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -7,10 +7,20 @@ quadruped robot with accurate dimensions and proper forward kinematics.
 Author: MicroSpot Project
 """
 
+from dataclasses import dataclass
+from functools import lru_cache
+
 import plotly.graph_objects as go
 import numpy as np
 from math import radians, cos, sin, degrees
 
+# Numba JIT-compiles the FK and rotation kernels; the numpy paths are used without it
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 # Robot dimensions in meters (accurate SpotMicro dimensions)
 BODY_LENGTH = 0.186      # front-to-back hip distance
@@ -27,12 +37,91 @@ LEG_CONFIG = {
     "RR": {"channels": [9, 10, 11], "color": "#ffaa44", "side": "right", "end": "rear"},
 }
 
+# Body box: corner directions and half extents (x, y = thickness 50mm total, z)
+_BODY_DIRS = np.array([
+    [1, 1, 1],     # 0: front-top-left
+    [1, 1, -1],    # 1: front-top-right
+    [-1, 1, -1],   # 2: back-top-right
+    [-1, 1, 1],    # 3: back-top-left
+    [1, -1, 1],    # 4: front-bottom-left
+    [1, -1, -1],   # 5: front-bottom-right
+    [-1, -1, -1],  # 6: back-bottom-right
+    [-1, -1, 1],   # 7: back-bottom-left
+], dtype=np.float32)
+_BODY_HALF_EXTENTS = np.array([BODY_LENGTH / 2, 0.025, BODY_WIDTH / 2], dtype=np.float32)
+_BODY_VERTICES = _BODY_DIRS * _BODY_HALF_EXTENTS  # centered at body height 0
+
+# Triangle indices for all 6 body faces (2 triangles per face)
+_BODY_I = (0, 0, 4, 4, 0, 0, 2, 2, 0, 0, 7, 7)
+_BODY_J = (1, 2, 5, 6, 1, 4, 3, 7, 3, 4, 3, 6)
+_BODY_K = (2, 3, 6, 7, 5, 5, 7, 6, 4, 7, 2, 2)
+
+# Body outline as one polyline over the 8 corners plus a NaN row (index 8) that
+# breaks the line: top loop, bottom loop, then the 4 vertical edges
+_OUTLINE_IDX = np.array([0, 1, 2, 3, 0, 8, 4, 5, 6, 7, 4, 8, 0, 4, 8, 1, 5, 8, 2, 6, 8, 3, 7])
+_NAN_ROW = np.full((1, 3), np.nan, dtype=np.float32)
+
+# Head cone mesh: vertex 0 is the tip, 1-8 the base circle; one side triangle per base edge
+_CONE_I = (0,) * 8
+_CONE_J = tuple(range(1, 9))
+_CONE_K = tuple(x % 8 + 1 for x in range(1, 9))
+
+_LEG_IDS = tuple(LEG_CONFIG)
+_LEG_COLORS = tuple(cfg["color"] for cfg in LEG_CONFIG.values())
+
+# Sideways leg direction per leg in LEG_CONFIG order: +Z for left legs, -Z for right
+_LEG_Z_DIRS = np.array([1.0 if cfg["side"] == "left" else -1.0 for cfg in LEG_CONFIG.values()],
+                       dtype=np.float32)
+
+# Hip attachment points relative to the body center, in LEG_CONFIG order: FL, FR, RL, RR
+_HIP_OFFSETS = np.array([
+    [BODY_LENGTH / 2, 0, BODY_WIDTH / 2],
+    [BODY_LENGTH / 2, 0, -BODY_WIDTH / 2],
+    [-BODY_LENGTH / 2, 0, BODY_WIDTH / 2],
+    [-BODY_LENGTH / 2, 0, -BODY_WIDTH / 2],
+], dtype=np.float32)
+
+# Segment lengths (hip, upper leg, lower leg) for the FK kernels
+_LEG_LENGTHS = np.array([HIP_LENGTH, UPPER_LEG_LENGTH, LOWER_LEG_LENGTH], dtype=np.float32)
+
+# Head cone relative to the body center: tip (row 0), then 8 base circle points
+# (30mm long, 15mm radius, based at the front face)
+_CONE_ANGLES = 2 * np.pi * np.arange(8) / 8
+_CONE_POINTS = np.vstack([
+    [BODY_LENGTH / 2 + 0.03, 0, 0],
+    np.column_stack([np.full(8, BODY_LENGTH / 2), 0.015 * np.cos(_CONE_ANGLES),
+                     0.015 * np.sin(_CONE_ANGLES)]),
+]).astype(np.float32)
+
+# The figure is drawn in mm (Plotly works better with larger numbers); the
+# geometry is built in mm from these so no per-frame scaling is needed
+MM_PER_M = 1000
+_BODY_VERTICES_MM = _BODY_VERTICES * MM_PER_M
+_HIP_OFFSETS_MM = _HIP_OFFSETS * MM_PER_M
+_LEG_LENGTHS_MM = _LEG_LENGTHS * MM_PER_M
+_CONE_POINTS_MM = _CONE_POINTS * MM_PER_M
+_FEET_Y_MM = np.ones(4, dtype=np.float32)  # Foot contacts slightly above ground
+
 
 def get_servo_angle(servo_angles: dict, channel: int) -> float:
     """Get servo angle handling both int and string keys from JSON."""
     return servo_angles.get(channel, servo_angles.get(str(channel), 90))
 
 
+def _normalize_servo_angles(servo_angles: dict) -> np.ndarray:
+    """
+    Servo angles as a length-12 array indexed by channel, 90 for missing channels.
+
+    Accepts int or string keys (JSON); channels outside 0-11 are ignored.
+    """
+    arr = np.full(12, 90.0)
+    for key, angle in servo_angles.items():
+        channel = int(key)
+        if 0 <= channel < 12:
+            arr[channel] = angle
+    return arr
+
+
 def rotation_matrix_x(angle_rad: float) -> np.ndarray:
     """Rotation matrix around X axis."""
     c, s = cos(angle_rad), sin(angle_rad)
@@ -40,7 +129,7 @@ def rotation_matrix_x(angle_rad: float) -> np.ndarray:
         [1, 0, 0],
         [0, c, -s],
         [0, s, c]
-    ])
+    ], dtype=np.float32)
 
 
 def rotation_matrix_y(angle_rad: float) -> np.ndarray:
@@ -50,7 +139,7 @@ def rotation_matrix_y(angle_rad: float) -> np.ndarray:
         [c, 0, s],
         [0, 1, 0],
         [-s, 0, c]
-    ])
+    ], dtype=np.float32)
 
 
 def rotation_matrix_z(angle_rad: float) -> np.ndarray:
@@ -60,7 +149,101 @@ def rotation_matrix_z(angle_rad: float) -> np.ndarray:
         [c, -s, 0],
         [s, c, 0],
         [0, 0, 1]
-    ])
+    ], dtype=np.float32)
+
+
+def _body_rotation_matrix(pitch: float, roll: float, yaw: float) -> np.ndarray:
+    """
+    Combined body rotation matrix (order: yaw -> pitch -> roll), angles in degrees.
+
+    Closed form of rotation_matrix_x(roll) @ rotation_matrix_z(pitch) @ rotation_matrix_y(yaw),
+    built in a single allocation.
+    """
+    cr, sr = cos(radians(roll)), sin(radians(roll))
+    cp, sp = cos(radians(pitch)), sin(radians(pitch))
+    cy, sy = cos(radians(yaw)), sin(radians(yaw))
+    return np.array([
+        [cp * cy, -sp, cp * sy],
+        [cr * sp * cy + sr * sy, cr * cp, cr * sp * sy - sr * cy],
+        [sr * sp * cy - cr * sy, sr * cp, sr * sp * sy + cr * cy]
+    ], dtype=np.float32)
+
+
+def _rotate_points(points: np.ndarray, R: np.ndarray, center: np.ndarray) -> np.ndarray:
+    """Rotate Nx3 float32 points by R around center (numpy fallback)."""
+    # Row vectors, so multiply by R transposed
+    return (points - center) @ R.T + center
+
+
+def _leg_fk(hip_origins: np.ndarray, angles: np.ndarray, z_dirs: np.ndarray,
+            lengths: np.ndarray) -> np.ndarray:
+    """
+    Forward kinematics for N legs (numpy fallback).
+
+    Args:
+        hip_origins: Nx3 float32 leg attachment points
+        angles: Nx3 float32 (hip, knee, ankle) servo angles (90 = neutral)
+        z_dirs: length-N float32 sideways direction (+1 left, -1 right)
+        lengths: float32 (hip, upper leg, lower leg) lengths, in the unit of hip_origins
+
+    Returns:
+        Nx3x3 float32 array: leg, (hip_end, knee_end, foot_end), xyz
+    """
+    # Columns: upper leg angle (hip + knee), total angle (hip + knee + ankle);
+    # one sin and one cos call for all legs
+    seg_angles = np.cumsum(np.radians(angles - 90), axis=1)[:, 1:]
+    s, c = np.sin(seg_angles), np.cos(seg_angles)
+
+    out = np.empty((len(hip_origins), 3, 3), dtype=np.float32)
+    out[:, :, :] = hip_origins[:, None, :]
+    hip_len, upper_len, lower_len = lengths
+    out[:, :, 2] += (z_dirs * hip_len)[:, None]
+    out[:, 1:, 0] += (upper_len * s[:, 0])[:, None]
+    out[:, 1:, 1] -= (upper_len * c[:, 0])[:, None]
+    out[:, 2, 0] += lower_len * s[:, 1]
+    out[:, 2, 1] -= lower_len * c[:, 1]
+    return out
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _rotate_points(points, R, center):
+        """Rotate Nx3 float32 points by R around center (JIT kernel)."""
+        out = np.empty_like(points)
+        for n in range(points.shape[0]):
+            px = points[n, 0] - center[0]
+            py = points[n, 1] - center[1]
+            pz = points[n, 2] - center[2]
+            for k in range(3):
+                out[n, k] = R[k, 0] * px + R[k, 1] * py + R[k, 2] * pz + center[k]
+        return out
+
+    @njit(cache=True, fastmath=True)
+    def _leg_fk(hip_origins, angles, z_dirs, lengths):
+        """Forward kinematics for N legs (JIT kernel), same layout as the numpy path."""
+        n_legs = hip_origins.shape[0]
+        out = np.empty((n_legs, 3, 3), dtype=np.float32)
+        deg = np.pi / 180.0
+        for n in range(n_legs):
+            upper_angle = (angles[n, 0] - 90.0) * deg + (angles[n, 1] - 90.0) * deg
+            total_angle = upper_angle + (angles[n, 2] - 90.0) * deg
+
+            hx = hip_origins[n, 0]
+            hy = hip_origins[n, 1]
+            hz = hip_origins[n, 2] + z_dirs[n] * lengths[0]
+            kx = hx + lengths[1] * np.sin(upper_angle)
+            ky = hy - lengths[1] * np.cos(upper_angle)
+
+            out[n, 0, 0] = hx
+            out[n, 0, 1] = hy
+            out[n, 0, 2] = hz
+            out[n, 1, 0] = kx
+            out[n, 1, 1] = ky
+            out[n, 1, 2] = hz
+            out[n, 2, 0] = kx + lengths[2] * np.sin(total_angle)
+            out[n, 2, 1] = ky - lengths[2] * np.cos(total_angle)
+            out[n, 2, 2] = hz
+        return out
 
 
 def apply_body_rotation(points: np.ndarray, pitch: float, roll: float, yaw: float,
@@ -81,20 +264,9 @@ def apply_body_rotation(points: np.ndarray, pitch: float, roll: float, yaw: floa
     if pitch == 0 and roll == 0 and yaw == 0:
         return points
 
-    # Convert to radians
-    pitch_rad = radians(pitch)
-    roll_rad = radians(roll)
-    yaw_rad = radians(yaw)
-
-    # Create combined rotation matrix (order: yaw -> pitch -> roll)
-    R = rotation_matrix_x(roll_rad) @ rotation_matrix_z(pitch_rad) @ rotation_matrix_y(yaw_rad)
-
-    # Apply rotation around center
-    rotated = np.zeros_like(points)
-    for i, p in enumerate(points):
-        rotated[i] = R @ (p - center) + center
-
-    return rotated
+    R = _body_rotation_matrix(pitch, roll, yaw)
+    points = np.ascontiguousarray(points, dtype=np.float32)
+    return _rotate_points(points, R, np.asarray(center, dtype=np.float32))
 
 
 def calculate_leg_points(hip_origin: np.ndarray, hip_angle: float, knee_angle: float,
@@ -121,7 +293,7 @@ def calculate_leg_points(hip_origin: np.ndarray, hip_angle: float, knee_angle: f
     z_dir = 1.0 if is_left_side else -1.0
 
     # Hip extends sideways from body
-    hip_end = hip_origin + np.array([0, 0, z_dir * HIP_LENGTH])
+    hip_end = hip_origin + np.array([0, 0, z_dir * HIP_LENGTH], dtype=np.float32)
 
     # Convert servo angles to radians
     # Hip angle affects forward/backward tilt of the leg (rotation around Z axis in leg frame)
@@ -139,21 +311,24 @@ def calculate_leg_points(hip_origin: np.ndarray, hip_angle: float, knee_angle: f
     # Hip rotation affects X position (forward/back lean)
     # Knee rotation affects the bend
 
+    # Segment angles from vertical: upper leg (hip + knee), lower leg (hip + knee + ankle),
+    # both through a single sin and cos call
+    seg_angles = np.array([hip_rad + knee_rad, hip_rad + knee_rad + ankle_rad])
+    s, c = np.sin(seg_angles), np.cos(seg_angles)
+
     # Upper leg endpoint (knee position)
     # The knee angle determines how much the upper leg bends from vertical
     # The hip angle adds a forward/backward tilt
-    knee_x = hip_end[0] + UPPER_LEG_LENGTH * sin(hip_rad + knee_rad)
-    knee_y = hip_end[1] - UPPER_LEG_LENGTH * cos(hip_rad + knee_rad)
+    knee_x = hip_end[0] + UPPER_LEG_LENGTH * s[0]
+    knee_y = hip_end[1] - UPPER_LEG_LENGTH * c[0]
     knee_z = hip_end[2]  # No sideways movement in knee
-    knee_end = np.array([knee_x, knee_y, knee_z])
+    knee_end = np.array([knee_x, knee_y, knee_z], dtype=np.float32)
 
     # Lower leg: continues from knee, affected by ankle angle
-    # Total angle from vertical is hip + knee + ankle
-    total_angle = hip_rad + knee_rad + ankle_rad
-    foot_x = knee_end[0] + LOWER_LEG_LENGTH * sin(total_angle)
-    foot_y = knee_end[1] - LOWER_LEG_LENGTH * cos(total_angle)
+    foot_x = knee_end[0] + LOWER_LEG_LENGTH * s[1]
+    foot_y = knee_end[1] - LOWER_LEG_LENGTH * c[1]
     foot_z = knee_end[2]
-    foot_end = np.array([foot_x, foot_y, foot_z])
+    foot_end = np.array([foot_x, foot_y, foot_z], dtype=np.float32)
 
     return {
         "hip_origin": hip_origin,
@@ -163,6 +338,35 @@ def calculate_leg_points(hip_origin: np.ndarray, hip_angle: float, knee_angle: f
     }
 
 
+def calculate_all_legs(hip_origins: np.ndarray, hip_angles, knee_angles, ankle_angles,
+                       z_dirs: np.ndarray = None) -> dict:
+    """
+    Vectorized calculate_leg_points for several legs at once.
+
+    Args:
+        hip_origins: Nx3 array of leg attachment points
+        hip_angles, knee_angles, ankle_angles: length-N servo angles (90 = neutral)
+        z_dirs: length-N sideways direction, +1 for left legs and -1 for right
+                (default: LEG_CONFIG order FL, FR, RL, RR)
+
+    Returns:
+        Dict of Nx3 arrays: hip_origin, hip_end, knee_end, foot_end
+    """
+    if z_dirs is None:
+        z_dirs = _LEG_Z_DIRS
+
+    angles = np.column_stack([hip_angles, knee_angles, ankle_angles]).astype(np.float32)
+    joints = _leg_fk(np.ascontiguousarray(hip_origins, dtype=np.float32), angles,
+                     np.ascontiguousarray(z_dirs, dtype=np.float32), _LEG_LENGTHS)
+
+    return {
+        "hip_origin": hip_origins,
+        "hip_end": joints[:, 0],
+        "knee_end": joints[:, 1],
+        "foot_end": joints[:, 2]
+    }
+
+
 def create_body_mesh(body_y: float, body_pitch: float, body_roll: float,
                      body_yaw: float) -> tuple:
     """
@@ -171,32 +375,14 @@ def create_body_mesh(body_y: float, body_pitch: float, body_roll: float,
     Returns:
         Tuple of (vertices, i_indices, j_indices, k_indices) for Mesh3d
     """
-    hx = BODY_LENGTH / 2
-    hy = 0.025  # Body thickness (50mm total height)
-    hz = BODY_WIDTH / 2
-
-    # Body vertices (8 corners of a box)
-    vertices = np.array([
-        [hx, body_y + hy, hz],    # 0: front-top-left
-        [hx, body_y + hy, -hz],   # 1: front-top-right
-        [-hx, body_y + hy, -hz],  # 2: back-top-right
-        [-hx, body_y + hy, hz],   # 3: back-top-left
-        [hx, body_y - hy, hz],    # 4: front-bottom-left
-        [hx, body_y - hy, -hz],   # 5: front-bottom-right
-        [-hx, body_y - hy, -hz],  # 6: back-bottom-right
-        [-hx, body_y - hy, hz],   # 7: back-bottom-left
-    ])
+    # Body vertices (8 corners of a box), lifted to body height
+    center = np.array([0, body_y, 0], dtype=np.float32)
+    vertices = _BODY_VERTICES + center
 
     # Apply body rotation
-    center = np.array([0, body_y, 0])
     vertices = apply_body_rotation(vertices, body_pitch, body_roll, body_yaw, center)
 
-    # Triangle indices for all 6 faces (2 triangles per face)
-    i = [0, 0, 4, 4, 0, 0, 2, 2, 0, 0, 7, 7]
-    j = [1, 2, 5, 6, 1, 4, 3, 7, 3, 4, 3, 6]
-    k = [2, 3, 6, 7, 5, 5, 7, 6, 4, 7, 2, 2]
-
-    return vertices, i, j, k
+    return vertices, _BODY_I, _BODY_J, _BODY_K
 
 
 def create_head_indicator(body_y: float, body_pitch: float, body_roll: float,
@@ -207,52 +393,36 @@ def create_head_indicator(body_y: float, body_pitch: float, body_roll: float,
     Returns:
         Tuple of (tip_point, base_points) for drawing
     """
-    hx = BODY_LENGTH / 2
-    cone_length = 0.03  # 30mm cone
-    cone_radius = 0.015  # 15mm radius
-
-    # Cone tip at front of robot
-    tip = np.array([hx + cone_length, body_y, 0])
-
-    # Base of cone (circle approximation)
-    n_points = 8
-    base_points = []
-    for i in range(n_points):
-        angle = 2 * np.pi * i / n_points
-        point = np.array([
-            hx,
-            body_y + cone_radius * cos(angle),
-            cone_radius * sin(angle)
-        ])
-        base_points.append(point)
-    base_points = np.array(base_points)
+    # Cone tip at front of robot, base circle (8-point approximation) behind it
+    center = np.array([0, body_y, 0], dtype=np.float32)
+    points = apply_body_rotation(_CONE_POINTS + center, body_pitch, body_roll, body_yaw, center)
 
-    # Apply body rotation
-    center = np.array([0, body_y, 0])
-    tip = apply_body_rotation(np.array([tip]), body_pitch, body_roll, body_yaw, center)[0]
-    base_points = apply_body_rotation(base_points, body_pitch, body_roll, body_yaw, center)
+    return points[0], points[1:]
 
-    return tip, base_points
 
-
-def create_ground_grid(size: float = 0.3, divisions: int = 10) -> list:
+@lru_cache(maxsize=8)
+def create_ground_grid(size: float = 0.3, divisions: int = 10, scale: float = 1.0) -> tuple:
     """
     Create ground plane with grid lines.
 
+    The result only depends on the arguments, so it is cached; treat the
+    returned traces as read-only (add_trace copies them into the figure).
+
     Args:
         size: Half-size of the ground plane in meters
         divisions: Number of grid divisions
+        scale: Factor applied to all coordinates (1000 for mm)
 
     Returns:
-        List of traces for the ground plane and grid
+        Tuple of traces: ground plane mesh and all grid lines as one trace
     """
-    traces = []
+    s = size * scale
 
     # Ground plane mesh
-    traces.append(go.Mesh3d(
-        x=[-size, size, size, -size],
+    plane = go.Mesh3d(
+        x=[-s, s, s, -s],
         y=[0, 0, 0, 0],
-        z=[-size, -size, size, size],
+        z=[-s, -s, s, s],
         i=[0, 0],
         j=[1, 2],
         k=[2, 3],
@@ -260,39 +430,152 @@ def create_ground_grid(size: float = 0.3, divisions: int = 10) -> list:
         opacity=0.4,
         showlegend=False,
         hoverinfo='skip'
-    ))
-
-    # Grid lines
-    step = 2 * size / divisions
-    grid_color = '#333344'
+    )
 
-    # Lines parallel to X axis
+    # Grid lines, separated by None gaps: first parallel to X, then parallel to Z
+    step = 2 * s / divisions
+    xs, zs = [], []
     for i in range(divisions + 1):
-        z = -size + i * step
-        traces.append(go.Scatter3d(
-            x=[-size, size],
-            y=[0, 0],
-            z=[z, z],
-            mode='lines',
-            line=dict(color=grid_color, width=1),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-
-    # Lines parallel to Z axis
+        offset = -s + i * step
+        xs += [-s, s, None]
+        zs += [offset, offset, None]
     for i in range(divisions + 1):
-        x = -size + i * step
-        traces.append(go.Scatter3d(
-            x=[x, x],
-            y=[0, 0],
-            z=[-size, size],
-            mode='lines',
-            line=dict(color=grid_color, width=1),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
+        offset = -s + i * step
+        xs += [offset, offset, None]
+        zs += [-s, s, None]
+
+    grid = go.Scatter3d(
+        x=xs,
+        y=[0 if x is not None else None for x in xs],
+        z=zs,
+        mode='lines',
+        line=dict(color='#333344', width=1),
+        connectgaps=False,
+        showlegend=False,
+        hoverinfo='skip'
+    )
 
-    return traces
+    return plane, grid
+
+
+@dataclass(frozen=True)
+class RobotGeometry:
+    """Posed robot geometry in mm, ready to be turned into traces."""
+    body_vertices: np.ndarray  # (8, 3) body box corners
+    cone: np.ndarray           # (9, 3) head cone tip, then base circle
+    hip_origins: np.ndarray    # (4, 3) hip attachment points
+    leg_joints: np.ndarray     # (4, 3, 3) leg, (hip_end, knee_end, foot_end), xyz
+    leg_angles: tuple          # (hip, knee, ankle) servo angles per leg
+
+
+@lru_cache(maxsize=128)
+def _compute_geometry(servo_key: tuple, body_pitch: float, body_roll: float,
+                      body_yaw: float, body_height: float) -> RobotGeometry:
+    """
+    Compute all robot geometry for one pose (no Plotly objects).
+
+    Cached on the quantized pose, so the returned arrays are shared between
+    calls and marked read-only.
+
+    Args:
+        servo_key: Tuple of the 12 servo angles, indexed by channel
+        body_pitch, body_roll, body_yaw: Body orientation in degrees
+        body_height: Body height in meters
+    """
+    # Body center in mm (Y is up)
+    center = np.array([0, body_height * MM_PER_M, 0], dtype=np.float32)
+
+    # Build all body-attached geometry in the unrotated body frame
+    hip_origins = _HIP_OFFSETS_MM + center
+    body_vertices = _BODY_VERTICES_MM + center
+    cone = _CONE_POINTS_MM + center
+
+    # Leg forward kinematics for all four legs at once; rows are (hip, knee, ankle)
+    leg_angles = tuple(
+        tuple(servo_key[ch] for ch in config["channels"])
+        for config in LEG_CONFIG.values()
+    )
+    angles = np.array(leg_angles, dtype=np.float32)
+    # Leg-major order: FL hip/knee/foot, FR hip/knee/foot, ...
+    leg_joints = _leg_fk(hip_origins, angles, _LEG_Z_DIRS, _LEG_LENGTHS_MM).reshape(-1, 3)
+
+    # Rotate everything with the body in one batch, then split the groups back out.
+    # A level body (the common idle case) skips the stacking and copying entirely.
+    if body_pitch or body_roll or body_yaw:
+        groups = [body_vertices, cone, hip_origins, leg_joints]
+        rotated = apply_body_rotation(np.vstack(groups), body_pitch, body_roll, body_yaw, center)
+        body_vertices, cone, hip_origins, leg_joints = np.split(
+            rotated, np.cumsum([len(g) for g in groups])[:-1]
+        )
+    leg_joints = leg_joints.reshape(4, 3, 3)
+
+    arrays = (body_vertices, cone, hip_origins, leg_joints)
+    for arr in arrays:
+        arr.flags.writeable = False
+    return RobotGeometry(*arrays, leg_angles)
+
+
+# Figure trace order produced by create_3d_robot; the pose-dependent traces
+# are patched in place by update_3d_robot_patch using these indices
+_TRACE_ORDER = (
+    "body", "outline", "cone", *LEG_CONFIG, "ground", "grid", "feet",
+)
+TRACE_INDEX = {name: idx for idx, name in enumerate(_TRACE_ORDER)}
+
+
+def _pose_geometry(servo_angles: dict, body_pitch: float, body_roll: float,
+                   body_yaw: float, body_height: float = None) -> RobotGeometry:
+    """Resolve the default body height, quantize the pose and fetch its cached geometry."""
+    # Calculate body height based on leg positions, or use default
+    # Default standing height with legs at 45 degree knee bend
+    if body_height is None:
+        # Estimate from average leg extension
+        # At neutral (90 deg), legs point straight down
+        default_knee = 90
+        default_ankle = 90
+        knee_rad = radians(default_knee - 90)
+        ankle_rad = radians(default_ankle - 90)
+        body_height = (UPPER_LEG_LENGTH * cos(knee_rad) +
+                      LOWER_LEG_LENGTH * cos(knee_rad + ankle_rad))
+
+    # Quantize the inputs (0.1 deg, 1 mm) so repeated poses hit the geometry cache
+    servo_key = tuple(np.round(_normalize_servo_angles(servo_angles), 1).tolist())
+    return _compute_geometry(servo_key, round(body_pitch, 1), round(body_roll, 1),
+                             round(body_yaw, 1), round(body_height, 3))
+
+
+def _pose_trace_data(geom: RobotGeometry) -> dict:
+    """
+    Coordinates (and hover text) of every pose-dependent trace, keyed by trace name.
+
+    Each value is a dict of trace properties (x, y, z[, text]) that can be passed to
+    the trace constructor or written into a figure patch.
+    """
+    def xyz(points):
+        return {"x": points[:, 0], "y": points[:, 1], "z": points[:, 2]}
+
+    verts = geom.body_vertices
+    data = {
+        "body": xyz(verts),
+        "outline": xyz(np.vstack([verts, _NAN_ROW])[_OUTLINE_IDX]),
+        "cone": xyz(geom.cone),
+    }
+
+    for idx, leg_id in enumerate(LEG_CONFIG):
+        hip_angle, knee_angle, ankle_angle = geom.leg_angles[idx]
+        points = np.vstack([geom.hip_origins[idx], geom.leg_joints[idx]])
+        data[leg_id] = xyz(points)
+        data[leg_id]["text"] = [
+            f'{leg_id} Hip<br>Angle: {hip_angle:.1f}',
+            f'{leg_id} Knee<br>Angle: {knee_angle:.1f}',
+            f'{leg_id} Foot<br>Ankle: {ankle_angle:.1f}',
+            f'{leg_id} Foot<br>Ankle: {ankle_angle:.1f}',
+        ]
+
+    # Feet projected to the ground
+    feet = geom.leg_joints[:, 2]
+    data["feet"] = {"x": feet[:, 0], "y": _FEET_Y_MM, "z": feet[:, 2]}
+    return data
 
 
 def create_3d_robot(
@@ -320,51 +603,16 @@ def create_3d_robot(
     """
     fig = go.Figure()
 
-    # Calculate body height based on leg positions, or use default
-    # Default standing height with legs at 45 degree knee bend
-    if body_height is None:
-        # Estimate from average leg extension
-        # At neutral (90 deg), legs point straight down
-        default_knee = 90
-        default_ankle = 90
-        knee_rad = radians(default_knee - 90)
-        ankle_rad = radians(default_ankle - 90)
-        body_height = (UPPER_LEG_LENGTH * cos(knee_rad) +
-                      LOWER_LEG_LENGTH * cos(knee_rad + ankle_rad))
-
-    body_y = body_height  # Y is up
-
-    # Convert to mm for display (Plotly works better with larger numbers)
-    scale = 1000  # meters to mm
-
-    # Hip attachment points on body
-    hx = BODY_LENGTH / 2
-    hz = BODY_WIDTH / 2
-
-    hip_origins = {
-        "FL": np.array([hx, body_y, hz]),
-        "FR": np.array([hx, body_y, -hz]),
-        "RL": np.array([-hx, body_y, hz]),
-        "RR": np.array([-hx, body_y, -hz]),
-    }
-
-    # Apply body rotation to hip origins
-    center = np.array([0, body_y, 0])
-    for leg_id in hip_origins:
-        hip_origins[leg_id] = apply_body_rotation(
-            np.array([hip_origins[leg_id]]),
-            body_pitch, body_roll, body_yaw, center
-        )[0]
+    geom = _pose_geometry(servo_angles, body_pitch, body_roll, body_yaw, body_height)
+    pose = _pose_trace_data(geom)
 
+    # Traces are added in _TRACE_ORDER so update_3d_robot_patch can address them by index
     # Draw body
-    body_vertices, bi, bj, bk = create_body_mesh(body_y, body_pitch, body_roll, body_yaw)
     fig.add_trace(go.Mesh3d(
-        x=body_vertices[:, 0] * scale,
-        y=body_vertices[:, 1] * scale,
-        z=body_vertices[:, 2] * scale,
-        i=bi,
-        j=bj,
-        k=bk,
+        **pose["body"],
+        i=_BODY_I,
+        j=_BODY_J,
+        k=_BODY_K,
         color='#1a3a5c',
         opacity=0.9,
         name='Body',
@@ -372,158 +620,60 @@ def create_3d_robot(
         flatshading=True
     ))
 
-    # Body outline for better visibility
-    outline_indices = [0, 1, 2, 3, 0, 4, 5, 6, 7, 4]
-    outline_connections = [(0, 4), (1, 5), (2, 6), (3, 7)]
-
-    # Top and bottom outlines
-    for start_idx in [0, 4]:
-        indices = [start_idx, start_idx + 1, start_idx + 2, start_idx + 3, start_idx]
-        if start_idx == 4:
-            indices = [4, 5, 6, 7, 4]
-        fig.add_trace(go.Scatter3d(
-            x=[body_vertices[i, 0] * scale for i in indices],
-            y=[body_vertices[i, 1] * scale for i in indices],
-            z=[body_vertices[i, 2] * scale for i in indices],
-            mode='lines',
-            line=dict(color='#4a8ac7', width=3),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-
-    # Vertical edges
-    for top, bottom in outline_connections:
-        fig.add_trace(go.Scatter3d(
-            x=[body_vertices[top, 0] * scale, body_vertices[bottom, 0] * scale],
-            y=[body_vertices[top, 1] * scale, body_vertices[bottom, 1] * scale],
-            z=[body_vertices[top, 2] * scale, body_vertices[bottom, 2] * scale],
-            mode='lines',
-            line=dict(color='#4a8ac7', width=3),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-
-    # Draw head indicator (cone at front)
-    tip, base_points = create_head_indicator(body_y, body_pitch, body_roll, body_yaw)
-
-    # Draw cone as lines from base to tip
-    for i in range(len(base_points)):
-        fig.add_trace(go.Scatter3d(
-            x=[base_points[i, 0] * scale, tip[0] * scale],
-            y=[base_points[i, 1] * scale, tip[1] * scale],
-            z=[base_points[i, 2] * scale, tip[2] * scale],
-            mode='lines',
-            line=dict(color='#ffcc00', width=2),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-
-    # Cone base circle
-    base_x = [p[0] * scale for p in base_points] + [base_points[0, 0] * scale]
-    base_y = [p[1] * scale for p in base_points] + [base_points[0, 1] * scale]
-    base_z = [p[2] * scale for p in base_points] + [base_points[0, 2] * scale]
+    # Body outline for better visibility: all 12 box edges in one trace
     fig.add_trace(go.Scatter3d(
-        x=base_x,
-        y=base_y,
-        z=base_z,
+        **pose["outline"],
         mode='lines',
-        line=dict(color='#ffcc00', width=2),
+        line=dict(color='#4a8ac7', width=3),
+        connectgaps=False,
         showlegend=False,
         hoverinfo='skip'
     ))
 
-    # Draw legs
-    foot_positions = []
+    # Draw head indicator (cone at front) as a single mesh
+    fig.add_trace(go.Mesh3d(
+        **pose["cone"],
+        i=_CONE_I,
+        j=_CONE_J,
+        k=_CONE_K,
+        color='#ffcc00',
+        opacity=0.9,
+        flatshading=True,
+        showlegend=False,
+        hoverinfo='skip'
+    ))
 
+    # Draw legs: one polyline per leg (hip origin -> hip end -> knee -> foot)
     for leg_id, config in LEG_CONFIG.items():
-        channels = config["channels"]
         color = config["color"]
-        is_left = config["side"] == "left"
-
-        # Get servo angles
-        hip_angle = get_servo_angle(servo_angles, channels[0])
-        knee_angle = get_servo_angle(servo_angles, channels[1])
-        ankle_angle = get_servo_angle(servo_angles, channels[2])
-
-        # Calculate leg joint positions
-        leg_points = calculate_leg_points(
-            hip_origins[leg_id],
-            hip_angle,
-            knee_angle,
-            ankle_angle,
-            is_left
-        )
-
-        # Apply body rotation to leg points (except hip_origin which is already rotated)
-        for key in ["hip_end", "knee_end", "foot_end"]:
-            leg_points[key] = apply_body_rotation(
-                np.array([leg_points[key]]),
-                body_pitch, body_roll, body_yaw, center
-            )[0]
-
-        foot_positions.append(leg_points["foot_end"])
-
-        # Draw hip segment (body to hip_end)
         fig.add_trace(go.Scatter3d(
-            x=[leg_points["hip_origin"][0] * scale, leg_points["hip_end"][0] * scale],
-            y=[leg_points["hip_origin"][1] * scale, leg_points["hip_end"][1] * scale],
-            z=[leg_points["hip_origin"][2] * scale, leg_points["hip_end"][2] * scale],
-            mode='lines+markers',
-            line=dict(color=color, width=8),
-            marker=dict(size=[6, 8], color=color),
-            name=f'{leg_id} Hip',
-            showlegend=False,
-            hovertemplate=f'{leg_id} Hip<br>Angle: {hip_angle:.1f}<extra></extra>'
-        ))
-
-        # Draw upper leg (hip_end to knee_end)
-        fig.add_trace(go.Scatter3d(
-            x=[leg_points["hip_end"][0] * scale, leg_points["knee_end"][0] * scale],
-            y=[leg_points["hip_end"][1] * scale, leg_points["knee_end"][1] * scale],
-            z=[leg_points["hip_end"][2] * scale, leg_points["knee_end"][2] * scale],
+            **pose[leg_id],
             mode='lines+markers',
             line=dict(color=color, width=6),
-            marker=dict(size=[8, 6], color=color),
-            name=f'{leg_id} Upper',
-            showlegend=False,
-            hovertemplate=f'{leg_id} Knee<br>Angle: {knee_angle:.1f}<extra></extra>'
-        ))
-
-        # Draw lower leg (knee_end to foot_end)
-        fig.add_trace(go.Scatter3d(
-            x=[leg_points["knee_end"][0] * scale, leg_points["foot_end"][0] * scale],
-            y=[leg_points["knee_end"][1] * scale, leg_points["foot_end"][1] * scale],
-            z=[leg_points["knee_end"][2] * scale, leg_points["foot_end"][2] * scale],
-            mode='lines+markers',
-            line=dict(color=color, width=5),
-            marker=dict(size=[6, 10], color=color, symbol='diamond'),
+            marker=dict(size=[6, 8, 6, 10], color=color,
+                        symbol=['circle', 'circle', 'circle', 'diamond']),
             name=leg_id,
             showlegend=True,
-            hovertemplate=f'{leg_id} Foot<br>Ankle: {ankle_angle:.1f}<extra></extra>'
+            hovertemplate='%{text}<extra></extra>'
         ))
 
     # Add ground plane with grid
-    ground_traces = create_ground_grid(size=0.25, divisions=8)
-    for trace in ground_traces:
-        # Scale the ground traces
-        if hasattr(trace, 'x') and trace.x is not None:
-            trace.x = [x * scale if x is not None else None for x in trace.x]
-            trace.z = [z * scale if z is not None else None for z in trace.z]
+    for trace in create_ground_grid(size=0.25, divisions=8, scale=MM_PER_M):
         fig.add_trace(trace)
 
-    # Add foot contact indicators (circles on ground where feet would touch)
-    for i, (leg_id, foot_pos) in enumerate(zip(LEG_CONFIG.keys(), foot_positions)):
-        color = LEG_CONFIG[leg_id]["color"]
-        # Project foot to ground
-        fig.add_trace(go.Scatter3d(
-            x=[foot_pos[0] * scale],
-            y=[1],  # Slightly above ground
-            z=[foot_pos[2] * scale],
-            mode='markers',
-            marker=dict(size=8, color=color, symbol='circle', opacity=0.5),
-            showlegend=False,
-            hovertemplate=f'{leg_id} Ground Contact<extra></extra>'
-        ))
+    # Add foot contact indicators (circles on ground where feet would touch), one trace
+    fig.add_trace(go.Scatter3d(
+        **pose["feet"],
+        mode='markers',
+        marker=dict(size=8, color=_LEG_COLORS, symbol='circle', opacity=0.5),
+        showlegend=False,
+        text=_LEG_IDS,
+        hovertemplate='%{text} Ground Contact<extra></extra>'
+    ))
+
+    # Stable trace ids let plotly.js match traces across updates and reuse them
+    for trace, uid in zip(fig.data, _TRACE_ORDER):
+        trace.uid = uid
 
     # Calculate appropriate axis ranges
     axis_range = 300  # mm
@@ -561,8 +711,10 @@ def create_3d_robot(
                 center=dict(x=0, y=0.1, z=0),  # Look slightly up at the robot
                 up=dict(x=0, y=1, z=0)
             ),
-            bgcolor='#0a0a0f'
+            bgcolor='#0a0a0f',
+            uirevision='locked'  # Keep the user's camera across updates
         ),
+        uirevision='locked',
         height=height,
         margin=dict(l=0, r=0, t=30, b=0),
         paper_bgcolor='#0a0a0f',
@@ -586,6 +738,37 @@ def create_3d_robot(
     return fig
 
 
+def update_3d_robot_patch(
+    servo_angles: dict,
+    body_pitch: float = 0,
+    body_roll: float = 0,
+    body_yaw: float = 0,
+    body_height: float = None
+):
+    """
+    Dash Patch that moves the robot in a figure built by create_3d_robot.
+
+    Only the coordinates (and leg hover text) of the pose-dependent traces are
+    sent, so Plotly.js updates the existing traces instead of rebuilding the scene.
+
+    Args:
+        servo_angles, body_pitch, body_roll, body_yaw, body_height:
+            Same as create_3d_robot
+
+    Returns:
+        dash.Patch for the figure property of the dcc.Graph
+    """
+    from dash import Patch
+
+    geom = _pose_geometry(servo_angles, body_pitch, body_roll, body_yaw, body_height)
+    patch = Patch()
+    for name, props in _pose_trace_data(geom).items():
+        trace = patch["data"][TRACE_INDEX[name]]
+        for key, value in props.items():
+            trace[key] = value
+    return patch
+
+
 def create_3d_robot_simple(
     servo_angles: dict,
     height: int = 400
@@ -1,5 +1,181 @@
 """Robot SVG visualizations for IMU and tuning pages."""
 import math
+from functools import lru_cache
+from string import Template
+
+# SVG templates are filled in two steps: size-dependent ${...} fields once per
+# (width, height) via string.Template (cached), then the per-sample %(...)
+# fields with %-formatting. Literal percent signs are written as %%.
+
+# Arc end-point lookup for whole degrees -45..45 (index = degrees + 45); the
+# angle indicators clamp to this range and sub-degree arc precision is invisible.
+_ARC_COS = tuple(math.cos(math.radians(a)) for a in range(-45, 46))
+_ARC_SIN = tuple(math.sin(math.radians(a)) for a in range(-45, 46))
+
+_ROBOT_SVG = Template('''
+    <svg width="${width}" height="${height}" viewBox="0 0 ${width} ${height}" xmlns="http://www.w3.org/2000/svg">
+        <defs>
+            <linearGradient id="bodyGrad" x1="0%%" y1="0%%" x2="100%%" y2="100%%">
+                <stop offset="0%%" style="stop-color:#334155"/>
+                <stop offset="100%%" style="stop-color:#1e293b"/>
+            </linearGradient>
+        </defs>
+
+        <!-- Background -->
+        <rect width="${width}" height="${height}" fill="#0f172a" rx="8"/>
+
+        <!-- Grid lines -->
+        <line x1="${cx}" y1="20" x2="${cx}" y2="${grid_bottom}" stroke="#334155" stroke-width="1" stroke-dasharray="5,5"/>
+        <line x1="20" y1="${cy}" x2="${grid_right}" y2="${cy}" stroke="#334155" stroke-width="1" stroke-dasharray="5,5"/>
+
+        <!-- Safe zone circle -->
+        <circle cx="${cx}" cy="${cy}" r="${max_offset}" fill="none" stroke="#22c55e" stroke-width="2" opacity="0.3"/>
+        <circle cx="${cx}" cy="${cy}" r="${danger_radius}" fill="none" stroke="#ef4444" stroke-width="1" opacity="0.2"/>
+
+        <!-- Robot body (rotated based on roll) -->
+        <g transform="rotate(%(roll)s, ${cx}, ${cy})">
+            <!-- Body rectangle -->
+            <rect x="${body_x}" y="${body_y}" width="${body_w}" height="${body_h}"
+                  fill="url(#bodyGrad)" stroke="#64748b" stroke-width="2" rx="8"/>
+
+            <!-- Head indicator (front) -->
+            <polygon points="${cx},${head_tip} ${head_left},${head_base} ${head_right},${head_base}"
+                     fill="#3b82f6" stroke="#60a5fa" stroke-width="1"/>
+
+            <!-- Legs (circles at corners) -->
+            <circle cx="${leg_left}" cy="${leg_front}" r="8" fill="#475569" stroke="#64748b"/>
+            <circle cx="${leg_right}" cy="${leg_front}" r="8" fill="#475569" stroke="#64748b"/>
+            <circle cx="${leg_left}" cy="${leg_rear}" r="8" fill="#475569" stroke="#64748b"/>
+            <circle cx="${leg_right}" cy="${leg_rear}" r="8" fill="#475569" stroke="#64748b"/>
+        </g>
+
+        <!-- Tilt indicator dot -->
+        <circle cx="%(dot_x)s" cy="%(dot_y)s" r="12" fill="%(status_color)s" stroke="white" stroke-width="2">
+            <animate attributeName="opacity" values="1;0.6;1" dur="1s" repeatCount="indefinite"/>
+        </circle>
+
+        <!-- Center crosshair -->
+        <circle cx="${cx}" cy="${cy}" r="4" fill="none" stroke="#64748b" stroke-width="2"/>
+
+        <!-- Status text -->
+        <text x="${cx}" y="${text_y}" text-anchor="middle" fill="%(status_color)s" font-family="monospace" font-size="14" font-weight="bold">
+            %(status_text)s
+        </text>
+
+        <!-- Angle labels -->
+        <text x="${label_x}" y="${label_y}" text-anchor="end" fill="#94a3b8" font-family="monospace" font-size="11">
+            R: %(roll)+.1f
+        </text>
+        <text x="${cx}" y="25" text-anchor="middle" fill="#94a3b8" font-family="monospace" font-size="11">
+            P: %(pitch)+.1f
+        </text>
+    </svg>
+    ''')
+
+_SIDE_SVG = Template('''
+    <svg width="${width}" height="${height}" viewBox="0 0 ${width} ${height}" xmlns="http://www.w3.org/2000/svg">
+        <!-- Background -->
+        <rect width="${width}" height="${height}" fill="#0f172a" rx="6"/>
+
+        <!-- Ground line -->
+        <line x1="10" y1="${ground_y}" x2="${ground_right}" y2="${ground_y}" stroke="#334155" stroke-width="2"/>
+
+        <!-- Robot body (rotated for pitch) -->
+        <g transform="rotate(%(neg_pitch)s, ${cx}, ${cy})">
+            <rect x="${body_x}" y="${body_y}" width="${body_w}" height="${body_h}"
+                  fill="#334155" stroke="%(color)s" stroke-width="2" rx="4"/>
+
+            <!-- Head indicator -->
+            <circle cx="${head_x}" cy="${cy}" r="6" fill="#3b82f6"/>
+        </g>
+
+        <!-- Label -->
+        <text x="${cx}" y="15" text-anchor="middle" fill="#94a3b8" font-family="monospace" font-size="11">
+            PITCH: %(pitch)+.1f
+        </text>
+
+        <!-- Angle arc -->
+        <path d="M ${cx},${cy} L ${arc_x},${cy} A 40,40 0 0,%(sweep)s %(arc_end_x)s,%(arc_end_y)s"
+              fill="none" stroke="%(color)s" stroke-width="2" opacity="0.5"/>
+    </svg>
+    ''')
+
+_FRONT_SVG = Template('''
+    <svg width="${width}" height="${height}" viewBox="0 0 ${width} ${height}" xmlns="http://www.w3.org/2000/svg">
+        <!-- Background -->
+        <rect width="${width}" height="${height}" fill="#0f172a" rx="6"/>
+
+        <!-- Ground line -->
+        <line x1="10" y1="${ground_y}" x2="${ground_right}" y2="${ground_y}" stroke="#334155" stroke-width="2"/>
+
+        <!-- Robot body (rotated for roll) -->
+        <g transform="rotate(%(roll)s, ${cx}, ${cy})">
+            <rect x="${body_x}" y="${body_y}" width="${body_w}" height="${body_h}"
+                  fill="#334155" stroke="%(color)s" stroke-width="2" rx="4"/>
+
+            <!-- Left/Right indicators -->
+            <circle cx="${left_x}" cy="${cy}" r="5" fill="#f59e0b"/>
+            <circle cx="${right_x}" cy="${cy}" r="5" fill="#3b82f6"/>
+        </g>
+
+        <!-- Label -->
+        <text x="${cx}" y="15" text-anchor="middle" fill="#94a3b8" font-family="monospace" font-size="11">
+            ROLL: %(roll)+.1f
+        </text>
+
+        <!-- Angle arc -->
+        <path d="M ${cx},${cy} L ${cx},${arc_y} A 35,35 0 0,%(sweep)s %(arc_end_x)s,%(arc_end_y)s"
+              fill="none" stroke="%(color)s" stroke-width="2" opacity="0.5"/>
+    </svg>
+    ''')
+
+
+@lru_cache(maxsize=8)
+def _robot_svg_template(width: int, height: int) -> str:
+    """Top-down SVG with all size-dependent fields filled in."""
+    cx, cy = width // 2, height // 2
+    max_offset = min(width, height) // 4
+    body_w = width * 0.4
+    body_h = height * 0.5
+    return _ROBOT_SVG.substitute(
+        width=width, height=height, cx=cx, cy=cy,
+        grid_bottom=height - 20, grid_right=width - 20,
+        max_offset=max_offset, danger_radius=max_offset * 3,
+        body_x=cx - body_w/2, body_y=cy - body_h/2, body_w=body_w, body_h=body_h,
+        head_tip=cy - body_h/2 - 15, head_base=cy - body_h/2 + 5,
+        head_left=cx-12, head_right=cx+12,
+        leg_left=cx - body_w/2 - 10, leg_right=cx + body_w/2 + 10,
+        leg_front=cy - body_h/2 + 15, leg_rear=cy + body_h/2 - 15,
+        text_y=height - 15, label_x=width - 15, label_y=cy + 5,
+    )
+
+
+@lru_cache(maxsize=8)
+def _side_svg_template(width: int, height: int) -> str:
+    """Side-view SVG with all size-dependent fields filled in."""
+    cx, cy = width // 2, height // 2
+    body_w = width * 0.6
+    body_h = height * 0.25
+    return _SIDE_SVG.substitute(
+        width=width, height=height, cx=cx, cy=cy,
+        ground_y=cy + 25, ground_right=width-10,
+        body_x=cx - body_w/2, body_y=cy - body_h/2, body_w=body_w, body_h=body_h,
+        head_x=cx + body_w/2 - 10, arc_x=cx + 40,
+    )
+
+
+@lru_cache(maxsize=8)
+def _front_svg_template(width: int, height: int) -> str:
+    """Front-view SVG with all size-dependent fields filled in."""
+    cx, cy = width // 2, height // 2
+    body_w = width * 0.5
+    body_h = height * 0.3
+    return _FRONT_SVG.substitute(
+        width=width, height=height, cx=cx, cy=cy,
+        ground_y=cy + 25, ground_right=width-10,
+        body_x=cx - body_w/2, body_y=cy - body_h/2, body_w=body_w, body_h=body_h,
+        left_x=cx - body_w/2 + 8, right_x=cx + body_w/2 - 8, arc_y=cy - 35,
+    )
 
 
 def create_robot_svg(pitch: float, roll: float, width: int = 300, height: int = 300) -> str:
@@ -40,73 +216,18 @@ def create_robot_svg(pitch: float, roll: float, width: int = 300, height: int =
         status_color = "#ef4444"  # Red - excessive
         status_text = "DANGER"
 
-    # Robot body dimensions (scaled to fit)
-    body_w = width * 0.4
-    body_h = height * 0.5
-
-    svg = f'''
-    <svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg">
-        <defs>
-            <linearGradient id="bodyGrad" x1="0%" y1="0%" x2="100%" y2="100%">
-                <stop offset="0%" style="stop-color:#334155"/>
-                <stop offset="100%" style="stop-color:#1e293b"/>
-            </linearGradient>
-        </defs>
-
-        <!-- Background -->
-        <rect width="{width}" height="{height}" fill="#0f172a" rx="8"/>
-
-        <!-- Grid lines -->
-        <line x1="{cx}" y1="20" x2="{cx}" y2="{height-20}" stroke="#334155" stroke-width="1" stroke-dasharray="5,5"/>
-        <line x1="20" y1="{cy}" x2="{width-20}" y2="{cy}" stroke="#334155" stroke-width="1" stroke-dasharray="5,5"/>
-
-        <!-- Safe zone circle -->
-        <circle cx="{cx}" cy="{cy}" r="{max_offset}" fill="none" stroke="#22c55e" stroke-width="2" opacity="0.3"/>
-        <circle cx="{cx}" cy="{cy}" r="{max_offset * 3}" fill="none" stroke="#ef4444" stroke-width="1" opacity="0.2"/>
-
-        <!-- Robot body (rotated based on roll) -->
-        <g transform="rotate({roll}, {cx}, {cy})">
-            <!-- Body rectangle -->
-            <rect x="{cx - body_w/2}" y="{cy - body_h/2}" width="{body_w}" height="{body_h}"
-                  fill="url(#bodyGrad)" stroke="#64748b" stroke-width="2" rx="8"/>
-
-            <!-- Head indicator (front) -->
-            <polygon points="{cx},{cy - body_h/2 - 15} {cx-12},{cy - body_h/2 + 5} {cx+12},{cy - body_h/2 + 5}"
-                     fill="#3b82f6" stroke="#60a5fa" stroke-width="1"/>
-
-            <!-- Legs (circles at corners) -->
-            <circle cx="{cx - body_w/2 - 10}" cy="{cy - body_h/2 + 15}" r="8" fill="#475569" stroke="#64748b"/>
-            <circle cx="{cx + body_w/2 + 10}" cy="{cy - body_h/2 + 15}" r="8" fill="#475569" stroke="#64748b"/>
-            <circle cx="{cx - body_w/2 - 10}" cy="{cy + body_h/2 - 15}" r="8" fill="#475569" stroke="#64748b"/>
-            <circle cx="{cx + body_w/2 + 10}" cy="{cy + body_h/2 - 15}" r="8" fill="#475569" stroke="#64748b"/>
-        </g>
+    return _robot_svg_template(width, height) % {
+        "roll": roll,
+        "pitch": pitch,
+        "dot_x": cx + dx,
+        "dot_y": cy + dy,
+        "status_color": status_color,
+        "status_text": status_text,
+    }
 
-        <!-- Tilt indicator dot -->
-        <circle cx="{cx + dx}" cy="{cy + dy}" r="12" fill="{status_color}" stroke="white" stroke-width="2">
-            <animate attributeName="opacity" values="1;0.6;1" dur="1s" repeatCount="indefinite"/>
-        </circle>
 
-        <!-- Center crosshair -->
-        <circle cx="{cx}" cy="{cy}" r="4" fill="none" stroke="#64748b" stroke-width="2"/>
-
-        <!-- Status text -->
-        <text x="{cx}" y="{height - 15}" text-anchor="middle" fill="{status_color}" font-family="monospace" font-size="14" font-weight="bold">
-            {status_text}
-        </text>
-
-        <!-- Angle labels -->
-        <text x="{width - 15}" y="{cy + 5}" text-anchor="end" fill="#94a3b8" font-family="monospace" font-size="11">
-            R: {roll:+.1f}
-        </text>
-        <text x="{cx}" y="25" text-anchor="middle" fill="#94a3b8" font-family="monospace" font-size="11">
-            P: {pitch:+.1f}
-        </text>
-    </svg>
-    '''
-    return svg
-
-
-def create_side_svg(pitch: float, width: int = 180, height: int = 100) -> str:
+def create_side_svg(pitch: float, width: int = 180, height: int = 100,
+                    precise: bool = False) -> str:
     """
     Create a side-view SVG showing pitch angle.
 
@@ -114,6 +235,8 @@ def create_side_svg(pitch: float, width: int = 180, height: int = 100) -> str:
         pitch: Pitch angle in degrees (positive = nose up)
         width: SVG width in pixels
         height: SVG height in pixels
+        precise: Compute the angle arc with exact trig instead of the
+                 whole-degree lookup table
 
     Returns:
         HTML string with embedded SVG
@@ -129,41 +252,24 @@ def create_side_svg(pitch: float, width: int = 180, height: int = 100) -> str:
     else:
         color = "#ef4444"
 
-    # Robot body as a rectangle that tilts
-    body_w = width * 0.6
-    body_h = height * 0.25
-
-    svg = f'''
-    <svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg">
-        <!-- Background -->
-        <rect width="{width}" height="{height}" fill="#0f172a" rx="6"/>
-
-        <!-- Ground line -->
-        <line x1="10" y1="{cy + 25}" x2="{width-10}" y2="{cy + 25}" stroke="#334155" stroke-width="2"/>
-
-        <!-- Robot body (rotated for pitch) -->
-        <g transform="rotate({-pitch}, {cx}, {cy})">
-            <rect x="{cx - body_w/2}" y="{cy - body_h/2}" width="{body_w}" height="{body_h}"
-                  fill="#334155" stroke="{color}" stroke-width="2" rx="4"/>
-
-            <!-- Head indicator -->
-            <circle cx="{cx + body_w/2 - 10}" cy="{cy}" r="6" fill="#3b82f6"/>
-        </g>
-
-        <!-- Label -->
-        <text x="{width//2}" y="15" text-anchor="middle" fill="#94a3b8" font-family="monospace" font-size="11">
-            PITCH: {pitch:+.1f}
-        </text>
+    if precise:
+        arc_cos, arc_sin = math.cos(math.radians(-pitch)), math.sin(math.radians(-pitch))
+    else:
+        ai = 45 - int(round(pitch))
+        arc_cos, arc_sin = _ARC_COS[ai], _ARC_SIN[ai]
 
-        <!-- Angle arc -->
-        <path d="M {cx},{cy} L {cx + 40},{cy} A 40,40 0 0,{1 if pitch < 0 else 0} {cx + 40 * math.cos(math.radians(-pitch))},{cy + 40 * math.sin(math.radians(-pitch))}"
-              fill="none" stroke="{color}" stroke-width="2" opacity="0.5"/>
-    </svg>
-    '''
-    return svg
+    return _side_svg_template(width, height) % {
+        "pitch": pitch,
+        "neg_pitch": -pitch,
+        "color": color,
+        "sweep": 1 if pitch < 0 else 0,
+        "arc_end_x": cx + 40 * arc_cos,
+        "arc_end_y": cy + 40 * arc_sin,
+    }
 
 
-def create_front_svg(roll: float, width: int = 180, height: int = 100) -> str:
+def create_front_svg(roll: float, width: int = 180, height: int = 100,
+                     precise: bool = False) -> str:
     """
     Create a front-view SVG showing roll angle.
 
@@ -171,6 +277,8 @@ def create_front_svg(roll: float, width: int = 180, height: int = 100) -> str:
         roll: Roll angle in degrees (positive = right side down)
         width: SVG width in pixels
         height: SVG height in pixels
+        precise: Compute the angle arc with exact trig instead of the
+                 whole-degree lookup table
 
     Returns:
         HTML string with embedded SVG
@@ -186,36 +294,16 @@ def create_front_svg(roll: float, width: int = 180, height: int = 100) -> str:
     else:
         color = "#ef4444"
 
-    # Robot body dimensions
-    body_w = width * 0.5
-    body_h = height * 0.3
-
-    svg = f'''
-    <svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg">
-        <!-- Background -->
-        <rect width="{width}" height="{height}" fill="#0f172a" rx="6"/>
-
-        <!-- Ground line -->
-        <line x1="10" y1="{cy + 25}" x2="{width-10}" y2="{cy + 25}" stroke="#334155" stroke-width="2"/>
-
-        <!-- Robot body (rotated for roll) -->
-        <g transform="rotate({roll}, {cx}, {cy})">
-            <rect x="{cx - body_w/2}" y="{cy - body_h/2}" width="{body_w}" height="{body_h}"
-                  fill="#334155" stroke="{color}" stroke-width="2" rx="4"/>
-
-            <!-- Left/Right indicators -->
-            <circle cx="{cx - body_w/2 + 8}" cy="{cy}" r="5" fill="#f59e0b"/>
-            <circle cx="{cx + body_w/2 - 8}" cy="{cy}" r="5" fill="#3b82f6"/>
-        </g>
-
-        <!-- Label -->
-        <text x="{width//2}" y="15" text-anchor="middle" fill="#94a3b8" font-family="monospace" font-size="11">
-            ROLL: {roll:+.1f}
-        </text>
-
-        <!-- Angle arc -->
-        <path d="M {cx},{cy} L {cx},{cy - 35} A 35,35 0 0,{1 if roll > 0 else 0} {cx + 35 * math.sin(math.radians(roll))},{cy - 35 * math.cos(math.radians(roll))}"
-              fill="none" stroke="{color}" stroke-width="2" opacity="0.5"/>
-    </svg>
-    '''
-    return svg
+    if precise:
+        arc_cos, arc_sin = math.cos(math.radians(roll)), math.sin(math.radians(roll))
+    else:
+        ai = int(round(roll)) + 45
+        arc_cos, arc_sin = _ARC_COS[ai], _ARC_SIN[ai]
+
+    return _front_svg_template(width, height) % {
+        "roll": roll,
+        "color": color,
+        "sweep": 1 if roll > 0 else 0,
+        "arc_end_x": cx + 35 * arc_sin,
+        "arc_end_y": cy - 35 * arc_cos,
+    }
@@ -1,35 +1,45 @@
 """Settings page - PS4 controller info and custom poses."""
 import streamlit as st
-import requests
+import os
 import subprocess
+import requests
+from components.api import cmd, fetch_status, get_session, post_json
 
+# psutil is optional; without it the process check scans /proc directly
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
 
+
+@st.cache_data(ttl=3, show_spinner=False)
 def get_controller_status():
     """Check if PS4 controller is connected."""
-    try:
-        result = subprocess.run(
-            ["ls", "/dev/input/js0"],
-            capture_output=True,
-            timeout=2
-        )
-        return result.returncode == 0
-    except:
-        return False
+    return os.path.exists("/dev/input/js0")
 
 
+@st.cache_data(ttl=3, show_spinner=False)
 def get_controller_process():
-    """Check if ps4_controller.py is running."""
+    """Check if ps4_controller.py is running (psutil or a /proc scan, no pgrep fork)."""
+    if PSUTIL_AVAILABLE:
+        return any("ps4_controller.py" in " ".join(p.info["cmdline"] or [])
+                   for p in psutil.process_iter(["cmdline"]))
     try:
-        result = subprocess.run(
-            ["pgrep", "-f", "ps4_controller.py"],
-            capture_output=True,
-            timeout=2
-        )
-        return result.returncode == 0
-    except:
+        pids = [pid for pid in os.listdir("/proc") if pid.isdigit()]
+    except OSError:
         return False
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                if b"ps4_controller.py" in f.read():
+                    return True
+        except OSError:
+            continue  # process exited or is not readable
+    return False
 
 
+@st.cache_data(ttl=10, show_spinner=False)
 def get_paired_controller_mac():
     """Get MAC of paired PlayStation controller."""
     try:
@@ -47,6 +57,13 @@ def get_paired_controller_mac():
     return None
 
 
+def clear_controller_probes():
+    """Drop cached controller probe results so the next render checks again."""
+    get_controller_status.clear()
+    get_controller_process.clear()
+    get_paired_controller_mac.clear()
+
+
 def reconnect_controller():
     """Try to reconnect the controller."""
     mac = get_paired_controller_mac()
@@ -64,6 +81,7 @@ def reconnect_controller():
 
 def render_settings_page(api_url):
     st.title("Settings")
+    session = get_session()
 
     tab_controller, tab_poses, tab_system = st.tabs(["Controller", "Custom Poses", "System"])
 
@@ -72,6 +90,10 @@ def render_settings_page(api_url):
         st.subheader("PlayStation Controller")
         st.caption("Works with PS4 (DualShock 4) and PS5 (DualSense)")
 
+        # Probe results are cached for a few seconds; Re-scan forces a fresh check
+        if st.button("Re-scan"):
+            clear_controller_probes()
+
         # Status
         col1, col2 = st.columns(2)
 
@@ -100,9 +122,11 @@ def render_settings_page(api_url):
                             reconnect_controller()
                             import time
                             time.sleep(2)
+                            clear_controller_probes()
                             st.rerun()
                 with col2:
                     if st.button("Refresh", use_container_width=True):
+                        clear_controller_probes()
                         st.rerun()
                 st.caption("Tip: Press PS button to wake up controller")
             else:
@@ -224,7 +248,7 @@ def render_settings_page(api_url):
 
         # Fetch custom poses
         try:
-            resp = requests.get(f"{api_url}/api/custom_poses", timeout=2)
+            resp = session.get(f"{api_url}/api/custom_poses")
             custom_poses = resp.json().get("poses", {})
         except Exception as e:
             st.error(f"Cannot connect to backend: {e}")
@@ -232,7 +256,7 @@ def render_settings_page(api_url):
 
         # Fetch current angles
         try:
-            resp = requests.get(f"{api_url}/api/current_pose", timeout=2)
+            resp = session.get(f"{api_url}/api/current_pose")
             current_angles = resp.json().get("angles", {})
         except:
             current_angles = {}
@@ -252,23 +276,15 @@ def render_settings_page(api_url):
                     col_load, col_del = st.columns(2)
                     with col_load:
                         if st.button("Load", key=f"load_{pose_name}", use_container_width=True):
-                            try:
-                                resp = requests.post(f"{api_url}/api/custom_poses/{pose_name}/execute", timeout=5)
-                                if resp.json().get("status") == "ok":
-                                    st.success(f"Loaded {pose_name}!")
-                                    st.rerun()
-                            except Exception as e:
-                                st.error(f"Error: {e}")
+                            if cmd("POST", f"{api_url}/api/custom_poses/{pose_name}/execute",
+                                   ok_msg=f"Loaded {pose_name}!", invalidate=(fetch_status,), timeout=5):
+                                st.rerun()
 
                     with col_del:
                         if st.button("Del", key=f"del_{pose_name}", use_container_width=True):
-                            try:
-                                resp = requests.delete(f"{api_url}/api/custom_poses/{pose_name}", timeout=5)
-                                if resp.json().get("status") == "ok":
-                                    st.success(f"Deleted {pose_name}")
-                                    st.rerun()
-                            except Exception as e:
-                                st.error(f"Error: {e}")
+                            if cmd("DELETE", f"{api_url}/api/custom_poses/{pose_name}",
+                                   ok_msg=f"Deleted {pose_name}", timeout=5):
+                                st.rerun()
 
             st.divider()
 
@@ -292,29 +308,20 @@ def render_settings_page(api_url):
 
         if st.button("Save Current Position", type="primary", use_container_width=True, disabled=not new_pose_name):
             if new_pose_name:
-                try:
-                    data = {
-                        "description": new_pose_desc or "Custom pose",
-                        "angles": current_angles
-                    }
-                    resp = requests.post(f"{api_url}/api/custom_poses/{new_pose_name}", json=data, timeout=5)
-                    result = resp.json()
-
-                    if result.get("status") == "ok":
-                        st.success(f"Saved '{new_pose_name}'!")
-                        st.rerun()
-                    else:
-                        st.error(f"Error: {result.get('message', 'Unknown error')}")
-                except Exception as e:
-                    st.error(f"Error: {e}")
+                data = {
+                    "description": new_pose_desc or "Custom pose",
+                    "angles": current_angles
+                }
+                if cmd("POST", f"{api_url}/api/custom_poses/{new_pose_name}", json=data,
+                       ok_msg=f"Saved '{new_pose_name}'!", timeout=5):
+                    st.rerun()
 
     # === SYSTEM TAB ===
     with tab_system:
         st.subheader("System Info")
 
-        try:
-            status = requests.get(f"{api_url}/api/status", timeout=2).json()
-
+        ok, status = fetch_status(api_url)
+        if ok:
             col1, col2 = st.columns(2)
             with col1:
                 st.metric("Hardware", "Active" if status.get("hardware") else "Simulation")
@@ -324,7 +331,7 @@ def render_settings_page(api_url):
                 calibrated = sum(1 for s in calib.get("servos", {}).values()
                                 if s.get("calibrated", False))
                 st.metric("Calibrated Servos", f"{calibrated}/12")
-        except:
+        else:
             st.error("Cannot fetch system status")
 
         st.divider()
@@ -341,7 +348,7 @@ def render_settings_page(api_url):
         with col1:
             if st.button("Test API", use_container_width=True):
                 try:
-                    resp = requests.get(f"{api_url}/api/status", timeout=2)
+                    resp = session.get(f"{api_url}/api/status")
                     if resp.status_code == 200:
                         st.success("API working!")
                     else:
@@ -351,17 +358,13 @@ def render_settings_page(api_url):
 
         with col2:
             if st.button("Reset Servos to 90", use_container_width=True):
-                try:
-                    requests.post(f"{api_url}/api/reset", timeout=5)
-                    st.success("Reset complete")
-                except Exception as e:
-                    st.error(f"Error: {e}")
+                cmd("POST", f"{api_url}/api/reset", ok_msg="Reset complete", invalidate=(fetch_status,), timeout=5)
 
         with col3:
             if st.button("Emergency Stop", type="primary", use_container_width=True):
+                # gait/stop reports an error when gait is unavailable; the neutral pose is what matters
                 try:
-                    requests.post(f"{api_url}/api/gait/stop", timeout=2)
-                    requests.post(f"{api_url}/api/pose/neutral", timeout=2)
-                    st.success("Stopped!")
-                except Exception as e:
-                    st.error(f"Error: {e}")
+                    post_json(f"{api_url}/api/gait/stop")
+                except requests.RequestException:
+                    pass
+                cmd("POST", f"{api_url}/api/pose/neutral", ok_msg="Stopped!", invalidate=(fetch_status,), timeout=5)
@@ -1,47 +1,163 @@
 """Tuning page - Gait parameters and balance tuning."""
+import logging
+import threading
+
 import streamlit as st
 import requests
+from components.api import get_later, get_session, latest_angles, loads, post_json
 from components.robot_viz import create_robot_svg, create_side_svg, create_front_svg
 
+log = logging.getLogger(__name__)
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def fetch_tuning(api_url: str) -> dict:
+    """/api/tuning (persistent tuning.json); it only changes on save, so reruns reuse it.
+
+    Raises on failure, so errors are not cached.
+    """
+    response = get_session().get(f"{api_url}/api/tuning", timeout=2)
+    response.raise_for_status()
+    return loads(response.content)
+
 
 def save_tuning(api_url: str, key: str, value) -> bool:
     """Save a tuning parameter to the backend."""
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{api_url}/api/tuning/{key}",
             json={"value": value},
             timeout=2
         )
+        if response.ok:
+            fetch_tuning.clear()
         return response.ok
-    except:
+    except requests.RequestException as e:
+        log.debug("Saving tuning %s failed: %s", key, e)
         return False
 
 
+def save_tuning_bulk(api_url: str, values: dict) -> bool:
+    """Save several tuning parameters in one request (tuning.json is written once)."""
+    try:
+        response = post_json(f"{api_url}/api/tuning/bulk", values, timeout=2)
+        ok = response.ok and loads(response.content).get("ok", False)
+    except (requests.RequestException, ValueError):
+        return False
+    if ok:
+        fetch_tuning.clear()
+    return ok
+
+
+def apply_preset(api_url: str, name: str):
+    """Apply a server-side gait preset; returns the updated tuning, or None on failure."""
+    try:
+        result = loads(post_json(f"{api_url}/api/gait/preset/{name}", timeout=2).content)
+    except (requests.RequestException, ValueError):
+        return None
+    if result.get("status") != "ok":
+        return None
+    fetch_tuning.clear()
+    return result["tuning"]
+
+
+IMU_LIVE_INTERVAL = 0.2  # s between IMU Cal redraws while angles are pushed
+
+
+LIVE_APPLY_DEBOUNCE_S = 0.15  # slider changes are sent once they settle this long
+
+
+class RequestBatcher:
+    """Coalesces tuning values scheduled in quick succession into one bulk POST.
+
+    Each schedule() re-arms the timer, so a slider drag sends only the values it
+    settles on, all keys in a single /api/tuning/bulk request.
+    """
+
+    def __init__(self, api_url: str, delay: float = LIVE_APPLY_DEBOUNCE_S):
+        self.url = f"{api_url}/api/tuning/bulk"
+        self.delay = delay
+        self._pending = {}
+        self._last = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def schedule(self, key: str, value, current=None):
+        """Queue key=value unless it is already sent or queued.
+
+        current is what the backend has now; it is the baseline the first time key is seen.
+        """
+        with self._lock:
+            if value == self._last.setdefault(key, current):
+                return
+            self._last[key] = value
+            self._pending[key] = value
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Send everything queued so far in one request.
+
+        If the backend does not accept the batch, its values are forgotten so
+        scheduling the same value again retries it.
+        """
+        with self._lock:
+            payload, self._pending = self._pending, {}
+            self._timer = None
+        if not payload:
+            return
+        ok = False
+        try:
+            resp = post_json(self.url, payload, timeout=1)
+            if resp.ok:
+                fetch_tuning.clear()
+                ok = loads(resp.content).get("ok", False)
+        except (requests.RequestException, ValueError, AttributeError):
+            pass
+        if not ok:
+            with self._lock:
+                for key, value in payload.items():
+                    if self._last.get(key) == value:
+                        del self._last[key]
+
+
+def get_batcher(api_url: str) -> RequestBatcher:
+    """Per-session live-apply batcher."""
+    batcher = st.session_state.get("tuning_batcher")
+    if batcher is None or batcher.url != f"{api_url}/api/tuning/bulk":
+        batcher = st.session_state["tuning_batcher"] = RequestBatcher(api_url)
+    return batcher
+
+
 def render_tuning_page(api_url):
     st.title("Tuning")
+    session = get_session()
 
     # Initialize state variables
     tuning = {}
     pitch, roll = 0, 0
     connected = False
 
-    # Fetch tuning data from /api/tuning (persistent tuning.json)
+    # IMU angles come from the backend push stream; until it is live they are
+    # fetched fresh, overlapping the (usually cached) tuning fetch
+    ang = latest_angles(api_url)
+    streaming = ang is not None
+    ang_result = get_later(f"{api_url}/api/balance/angles", 1) if ang is None else None
     try:
-        tuning_response = requests.get(f"{api_url}/api/tuning", timeout=2)
-        if tuning_response.ok:
-            tuning = tuning_response.json()
-            connected = True
-    except:
+        # After a preset the rerun uses the tuning returned with it instead of a GET
+        tuning = st.session_state.pop("preset_tuning", None) or fetch_tuning(api_url)
+        connected = True
+    except (requests.RequestException, ValueError):
         st.error("Cannot connect to backend")
 
-    try:
-        ang_response = requests.get(f"{api_url}/api/balance/angles", timeout=1)
-        if ang_response.ok:
-            ang = ang_response.json()
-            pitch = ang.get("pitch", 0)
-            roll = ang.get("roll", 0)
-    except:
-        pass
+    if ang_result is not None:
+        ang = ang_result()
+    if ang is not None:
+        pitch = ang.get("pitch", 0)
+        roll = ang.get("roll", 0)
 
     # Connection status
     if connected:
@@ -49,6 +165,11 @@ def render_tuning_page(api_url):
     else:
         st.error("Disconnected")
 
+    # Live apply: slider changes are debounced and sent (and persisted) as one bulk update
+    live = st.toggle("Live apply", disabled=not connected,
+                     help="Apply and save slider changes while you drag them")
+    batcher = get_batcher(api_url) if live else None
+
     # Create tabs
     t1, t2, t3, t4 = st.tabs(["Stand", "IMU Cal", "Balance", "Gait"])
 
@@ -65,18 +186,20 @@ def render_tuning_page(api_url):
             step=5,
             help="Higher values = lower stance"
         )
+        if batcher:
+            batcher.schedule("knee_bend", kb, tuning.get("knee_bend"))
 
         c1, c2 = st.columns(2)
         with c1:
             if st.button("Preview", use_container_width=True, disabled=not connected):
                 try:
-                    response = requests.post(
+                    response = session.post(
                         f"{api_url}/api/gait/stand_height",
                         json={"knee_bend": kb},
                         timeout=2
                     )
                     if response.ok:
-                        preview_response = requests.post(
+                        preview_response = session.post(
                             f"{api_url}/api/gait/preview_stand",
                             timeout=2
                         )
@@ -99,27 +222,39 @@ def render_tuning_page(api_url):
         st.subheader("IMU Calibration")
         st.markdown("Place robot on a **flat surface**, check if the indicator is centered")
 
-        # Robot visualization
-        col1, col2 = st.columns([2, 1])
-        with col1:
-            st.markdown(create_robot_svg(pitch, roll, 280, 280), unsafe_allow_html=True)
-        with col2:
-            st.markdown(create_side_svg(pitch), unsafe_allow_html=True)
-            st.markdown(create_front_svg(roll), unsafe_allow_html=True)
+        # While the backend pushes angles, redraw from the latest frame without HTTP,
+        # so the indicator visibly settles after calibrating
+        @st.fragment(run_every=IMU_LIVE_INTERVAL if streaming else None)
+        def imu_view():
+            p, r = pitch, roll
+            latest = latest_angles(api_url)
+            if latest is not None:
+                p, r = latest.get("pitch", 0), latest.get("roll", 0)
+
+            # Robot visualization
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                st.markdown(create_robot_svg(p, r, 280, 280), unsafe_allow_html=True)
+            with col2:
+                st.markdown(create_side_svg(p), unsafe_allow_html=True)
+                st.markdown(create_front_svg(r), unsafe_allow_html=True)
+
+            # Level status
+            is_level = abs(p) < 2 and abs(r) < 2
+            if is_level:
+                st.success("LEVEL - Ready for calibration")
+            else:
+                st.warning(f"NOT LEVEL - Pitch: {p:.1f}, Roll: {r:.1f}")
 
-        # Level status
-        is_level = abs(pitch) < 2 and abs(roll) < 2
-        if is_level:
-            st.success("LEVEL - Ready for calibration")
-        else:
-            st.warning(f"NOT LEVEL - Pitch: {pitch:.1f}, Roll: {roll:.1f}")
+        imu_view()
 
         if st.button("CALIBRATE IMU", type="primary", use_container_width=True, disabled=not connected):
             try:
-                response = requests.post(f"{api_url}/api/balance/calibrate", timeout=5)
+                response = session.post(f"{api_url}/api/balance/calibrate", timeout=5)
                 if response.ok:
                     st.success("Zero point set to current position!")
-                    st.rerun()
+                    if not streaming:
+                        st.rerun()
                 else:
                     st.error("Calibration failed")
             except Exception as e:
@@ -138,15 +273,17 @@ def render_tuning_page(api_url):
             step=0.1,
             help="Higher = more aggressive correction"
         )
+        if batcher:
+            batcher.schedule("balance_kp", kp, tuning.get("balance_kp"))
 
         col1, col2 = st.columns(2)
         with col1:
             if st.button("Save", type="primary", key="sv3", use_container_width=True, disabled=not connected):
                 if save_tuning(api_url, "balance_kp", kp):
                     try:
-                        requests.post(f"{api_url}/api/balance/kp", json={"kp": kp}, timeout=2)
-                    except:
-                        pass
+                        session.post(f"{api_url}/api/balance/kp", json={"kp": kp}, timeout=2)
+                    except requests.RequestException as e:
+                        log.debug("Applying Kp failed: %s", e)
                     st.success("Saved!")
                 else:
                     st.error("Save failed")
@@ -154,7 +291,7 @@ def render_tuning_page(api_url):
         with col2:
             if st.button("Apply Live", key="apply_kp", use_container_width=True, disabled=not connected):
                 try:
-                    response = requests.post(f"{api_url}/api/balance/kp", json={"kp": kp}, timeout=2)
+                    response = session.post(f"{api_url}/api/balance/kp", json={"kp": kp}, timeout=2)
                     if response.ok:
                         st.info(f"Kp temporarily set to {kp}")
                     else:
@@ -184,13 +321,14 @@ def render_tuning_page(api_url):
             step=5,
             help="How high legs lift during walking"
         )
+        if batcher:
+            batcher.schedule("cycle_time", cyc, tuning.get("cycle_time"))
+            batcher.schedule("step_height", hgt, tuning.get("step_height"))
 
         col1, col2 = st.columns(2)
         with col1:
             if st.button("Save", type="primary", key="sv4", use_container_width=True, disabled=not connected):
-                success1 = save_tuning(api_url, "cycle_time", cyc)
-                success2 = save_tuning(api_url, "step_height", hgt)
-                if success1 and success2:
+                if save_tuning_bulk(api_url, {"cycle_time": cyc, "step_height": hgt}):
                     st.success("Saved!")
                 else:
                     st.error("Save failed")
@@ -198,7 +336,7 @@ def render_tuning_page(api_url):
         with col2:
             if st.button("Apply to Gait", key="apply_gait", use_container_width=True, disabled=not connected):
                 try:
-                    response = requests.post(
+                    response = session.post(
                         f"{api_url}/api/gait/params",
                         json={"cycle_time": cyc, "step_height": hgt},
                         timeout=2
@@ -212,36 +350,16 @@ def render_tuning_page(api_url):
 
         st.divider()
 
-        # Presets
+        # Presets (applied, saved to tuning.json and returned by the backend in one request)
         st.subheader("Presets")
-        c1, c2, c3 = st.columns(3)
-        with c1:
-            if st.button("Slow & Safe", use_container_width=True):
-                try:
-                    requests.post(f"{api_url}/api/gait/params", json={
-                        "cycle_time": 1.2, "step_height": 20
-                    }, timeout=2)
-                    st.success("Applied slow preset")
-                    st.rerun()
-                except:
-                    pass
-        with c2:
-            if st.button("Normal", use_container_width=True):
-                try:
-                    requests.post(f"{api_url}/api/gait/params", json={
-                        "cycle_time": 0.8, "step_height": 25
-                    }, timeout=2)
-                    st.success("Applied normal preset")
-                    st.rerun()
-                except:
-                    pass
-        with c3:
-            if st.button("Fast", use_container_width=True):
-                try:
-                    requests.post(f"{api_url}/api/gait/params", json={
-                        "cycle_time": 0.5, "step_height": 30
-                    }, timeout=2)
-                    st.success("Applied fast preset")
-                    st.rerun()
-                except:
-                    pass
+        presets = (("Slow & Safe", "slow"), ("Normal", "normal"), ("Fast", "fast"))
+        for col, (label, name) in zip(st.columns(3), presets):
+            with col:
+                if st.button(label, use_container_width=True):
+                    new_tuning = apply_preset(api_url, name)
+                    if new_tuning is not None:
+                        st.session_state["preset_tuning"] = new_tuning
+                        st.toast(f"Applied {name} preset")
+                        st.rerun()
+                    else:
+                        st.error("Preset failed")
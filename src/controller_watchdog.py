@@ -7,52 +7,183 @@ Automatically reconnects when controller disconnects
 import subprocess
 import time
 import os
+import random
+
+# inotify_simple is optional; without it the watchdog polls js0 every 2 sec
+try:
+    from inotify_simple import INotify, flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
+# pydbus talks to BlueZ directly; without it the watchdog shells out to bluetoothctl
+try:
+    import pydbus
+    from gi.repository import GLib
+    DBUS_AVAILABLE = True
+except ImportError:
+    DBUS_AVAILABLE = False
 
 # Known controller MAC (will be detected automatically)
 CONTROLLER_MAC = None
 
+INPUT_DIR = '/dev/input'
+JS_DEVICE = 'js0'
+POLL_INTERVAL = 2       # sec between checks without inotify
+SAFETY_TICK = 30        # sec; re-check even if no inotify event arrives
+BACKOFF_MAX = 60        # sec; cap for the delay between failed reconnects
+
+BLUEZ = 'org.bluez'
+ADAPTER_PATH = '/org/bluez/hci0'
+CONTROLLER_NAMES = ('Wireless Controller', 'DualSense')
+
+# Last detected MAC, so a restart can skip the bluetoothctl lookup
+MAC_CACHE_FILE = '/var/lib/spotmicro/controller.mac'
+
+_bus = None
+
+def _system_bus():
+    """Shared DBus system bus connection"""
+    global _bus
+    if _bus is None:
+        _bus = pydbus.SystemBus()
+    return _bus
+
+def _device_path(mac):
+    return f"{ADAPTER_PATH}/dev_{mac.replace(':', '_')}"
+
 def get_paired_controller():
     """Find paired PlayStation controller"""
+    if DBUS_AVAILABLE:
+        try:
+            objects = _system_bus().get(BLUEZ, '/').GetManagedObjects()
+            for interfaces in objects.values():
+                device = interfaces.get('org.bluez.Device1')
+                if device and device.get('Paired') and any(n in device.get('Name', '') for n in CONTROLLER_NAMES):
+                    return device['Address']
+            return None
+        except GLib.Error:
+            pass  # BlueZ not reachable over DBus, try bluetoothctl
     try:
         result = subprocess.run(
             ["bluetoothctl", "devices", "Paired"],
             capture_output=True, text=True, timeout=5
         )
         for line in result.stdout.split('\n'):
-            if 'Wireless Controller' in line or 'DualSense' in line:
+            if any(name in line for name in CONTROLLER_NAMES):
                 parts = line.split()
                 if len(parts) >= 2:
                     return parts[1]  # MAC address
-    except:
-        pass
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"[Watchdog] bluetoothctl devices failed: {e}")
     return None
 
+def _load_cached_mac():
+    """MAC saved by a previous run, or None"""
+    try:
+        with open(MAC_CACHE_FILE) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def _save_cached_mac(mac):
+    """Remember the controller MAC for the next start (None removes it)"""
+    try:
+        if mac:
+            os.makedirs(os.path.dirname(MAC_CACHE_FILE), exist_ok=True)
+            with open(MAC_CACHE_FILE, 'w') as f:
+                f.write(mac + '\n')
+        elif os.path.exists(MAC_CACHE_FILE):
+            os.remove(MAC_CACHE_FILE)
+    except OSError:
+        pass
+
+def is_paired(mac):
+    """Check a single known MAC instead of listing all paired devices"""
+    if DBUS_AVAILABLE:
+        try:
+            return bool(_system_bus().get(BLUEZ, _device_path(mac)).Paired)
+        except GLib.Error:
+            return False  # no such device object
+    try:
+        result = subprocess.run(
+            ["bluetoothctl", "info", mac],
+            capture_output=True, text=True, timeout=5
+        )
+        return 'Paired: yes' in result.stdout
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"[Watchdog] bluetoothctl info failed: {e}")
+        return False
+
 def is_controller_connected():
     """Check if controller is connected"""
-    return os.path.exists('/dev/input/js0')
+    return os.path.exists(os.path.join(INPUT_DIR, JS_DEVICE))
+
+def create_watcher():
+    """inotify watch on /dev/input for device create/delete, or None to poll"""
+    if not INOTIFY_AVAILABLE:
+        return None
+    try:
+        watcher = INotify()
+        watcher.add_watch(INPUT_DIR, flags.CREATE | flags.DELETE)
+        return watcher
+    except OSError:
+        return None
+
+def wait_for_change(watcher, timeout=None):
+    """Sleep until js0 appears/disappears or timeout sec pass
+
+    timeout defaults to the safety tick (the poll interval without inotify).
+    """
+    if watcher is None:
+        time.sleep(POLL_INTERVAL if timeout is None else timeout)
+        return
+    deadline = time.monotonic() + (SAFETY_TICK if timeout is None else timeout)
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        events = watcher.read(timeout=int(remaining * 1000))
+        if any(event.name == JS_DEVICE for event in events):
+            return
 
 def connect_controller(mac):
-    """Try to connect to controller"""
+    """Try to connect to controller (False if the device is gone or unpaired)"""
+    if DBUS_AVAILABLE:
+        try:
+            _system_bus().get(BLUEZ, _device_path(mac)).Connect()
+            return True
+        except GLib.Error as e:
+            # Connect errors (e.g. controller switched off) are left to the js0 check
+            return 'UnknownObject' not in str(e)
     try:
-        subprocess.run(
+        result = subprocess.run(
             ["bluetoothctl", "connect", mac],
-            capture_output=True, timeout=10
+            capture_output=True, text=True, timeout=10
         )
-        return True
-    except:
+        return 'not available' not in result.stdout and 'has been removed' not in result.stdout
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"[Watchdog] bluetoothctl connect failed: {e}")
         return False
 
 def ensure_bluetooth_on():
     """Make sure Bluetooth is enabled"""
+    if DBUS_AVAILABLE:
+        try:
+            _system_bus().get(BLUEZ, ADAPTER_PATH).Powered = True
+            return
+        except GLib.Error:
+            pass  # e.g. rfkill-blocked, which needs the shell commands below
+    # One shell instead of three separate forks; each step runs even if the previous failed
     try:
-        subprocess.run(["sudo", "rfkill", "unblock", "bluetooth"],
-                      capture_output=True, timeout=5)
-        subprocess.run(["sudo", "hciconfig", "hci0", "up"],
-                      capture_output=True, timeout=5)
-        subprocess.run(["bluetoothctl", "power", "on"],
-                      capture_output=True, timeout=5)
-    except:
-        pass
+        subprocess.run(["sh", "-c", "sudo rfkill unblock bluetooth; sudo hciconfig hci0 up; bluetoothctl power on"],
+                      capture_output=True, timeout=8)
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"[Watchdog] Bluetooth power-on failed: {e}")
+
+def backoff_delay(fail_count):
+    """1, 2, 4... sec up to BACKOFF_MAX, plus jitter so several watchdogs don't sync up"""
+    return min(BACKOFF_MAX, 2 ** fail_count) + random.uniform(0, 1)
 
 def main():
     global CONTROLLER_MAC
@@ -62,32 +193,51 @@ def main():
 
     ensure_bluetooth_on()
 
+    # Start from the cached MAC; only verify it when the controller is not already up
+    CONTROLLER_MAC = _load_cached_mac()
+    if CONTROLLER_MAC and not is_controller_connected() and not is_paired(CONTROLLER_MAC):
+        _save_cached_mac(None)
+        CONTROLLER_MAC = None
+    if CONTROLLER_MAC:
+        print(f"[Watchdog] Using cached controller: {CONTROLLER_MAC}")
+
+    watcher = create_watcher()
+    if watcher is None:
+        print(f"[Watchdog] inotify not available, polling every {POLL_INTERVAL} sec")
+
+    fail_count = 0
     while True:
         # Try to find controller MAC if not known
         if not CONTROLLER_MAC:
             CONTROLLER_MAC = get_paired_controller()
             if CONTROLLER_MAC:
                 print(f"[Watchdog] Found controller: {CONTROLLER_MAC}")
+                _save_cached_mac(CONTROLLER_MAC)
             else:
                 time.sleep(5)
                 continue
 
         # Check if connected
         if is_controller_connected():
-            time.sleep(2)  # All good, check again in 2 sec
+            fail_count = 0
+            wait_for_change(watcher)  # All good, wake up when js0 changes
         else:
             print("[Watchdog] Controller disconnected, reconnecting...")
             if connect_controller(CONTROLLER_MAC):
                 time.sleep(2)
                 if is_controller_connected():
                     print("[Watchdog] Reconnected!")
-                else:
-                    print("[Watchdog] Reconnect failed, waiting...")
-                    time.sleep(3)
+                    fail_count = 0
+                    continue
             else:
                 # Maybe controller was unpaired
                 CONTROLLER_MAC = get_paired_controller()
-                time.sleep(5)
+                _save_cached_mac(CONTROLLER_MAC)
+            # Back off while the controller stays off; a js0 event ends the wait early
+            delay = backoff_delay(fail_count)
+            fail_count += 1
+            print(f"[Watchdog] Reconnect failed, retrying in {delay:.0f} sec...")
+            wait_for_change(watcher, delay)
 
 if __name__ == "__main__":
     main()
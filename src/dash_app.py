@@ -16,7 +16,7 @@ import plotly.graph_objects as go
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import the working 3D robot visualization from Streamlit components
-from components.robot_3d import create_3d_robot
+from components.robot_3d import create_3d_robot, update_3d_robot_patch
 
 # ============== CONFIGURATION ==============
 
@@ -719,8 +719,8 @@ for leg in ["FL", "FR", "RL", "RR"]:
     make_leg_callback(leg)
 
 # ============== 3D VISUALIZATION ==============
-# Uses create_3d_robot imported from components/robot_3d.py
-# This is the same visualization that works in Streamlit!
+# The figure comes from create_3d_robot (components/robot_3d.py, shared with
+# Streamlit); updates are sent as patches via update_3d_robot_patch
 
 @callback(
     Output("robot-3d", "figure"),
@@ -754,37 +754,20 @@ def update_3d_view(n):
         print(f"Error getting IMU angles: {e}")
 
     try:
-        # Use the working create_3d_robot from robot_3d.py
-        # This is the exact same function that works in Streamlit!
-        fig = create_3d_robot(
+        # The figure is built once by create_3d_robot in the layout; each tick
+        # only patches the trace coordinates so Plotly.js keeps the WebGL scene
+        return update_3d_robot_patch(
             servo_angles=servo_angles,
             body_pitch=pitch,
             body_roll=roll,
-            body_yaw=0,
-            height=450
+            body_yaw=0
         )
-        return fig
     except Exception as e:
-        print(f"Error creating robot figure: {e}")
+        print(f"Error updating robot figure: {e}")
         import traceback
         traceback.print_exc()
-        # Return a simple test figure on error
-        fig = go.Figure()
-        fig.add_trace(go.Scatter3d(
-            x=[0, 100], y=[0, 100], z=[0, 0],
-            mode='lines+markers',
-            line=dict(color='red', width=5),
-            marker=dict(size=10),
-            name='Error - check terminal'
-        ))
-        fig.update_layout(
-            scene=dict(
-                xaxis=dict(range=[-200, 200], title='X'),
-                yaxis=dict(range=[-50, 300], title='Y (up)'),
-                zaxis=dict(range=[-200, 200], title='Z'),
-            )
-        )
-        return fig
+        # Keep the last good frame
+        raise PreventUpdate
 
 # ============== MAIN ==============
 
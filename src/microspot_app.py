@@ -4,8 +4,9 @@ MicroSpot Control v2.0 - With Spot Micro Kinematics Integration
 Complete quadruped robot control with proper IK/FK
 """
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 import uvicorn
+import asyncio
 import signal
 import sys
 import atexit
@@ -914,6 +915,24 @@ async def update_servo_calibration(channel: int, data: dict):
         return {"status": "ok", "channel": channel}
     return {"status": "error", "message": "Invalid channel"}
 
+@app.post("/api/calibration/batch")
+async def update_servo_calibration_batch(data: dict):
+    """Update calibration for several servos and save once.
+
+    Args (in data dict):
+        servos: Dict mapping channel -> calibration fields to update
+    """
+    if not calibration:
+        return {"status": "error", "message": "No calibration loaded"}
+    updated = []
+    for channel, servo_data in data.get("servos", {}).items():
+        channel = int(channel)
+        if channel in calibration.servos:
+            calibration.servos[channel].update(servo_data)
+            updated.append(channel)
+    save_calibration()
+    return {"status": "ok", "updated": updated}
+
 @app.post("/api/calibration/save")
 async def save_calibration_endpoint():
     """Save current calibration"""
@@ -960,6 +979,81 @@ def calibration_summary():
     return {"status": "ok", "calibration": calibration.to_dict()}
 
 # REST API endpoints for control (used by Streamlit)
+# NOTE: must be registered before /api/servo/{channel} so "batch" isn't parsed as a channel
+@app.post("/api/servo/batch")
+async def set_servo_batch_endpoint(data: dict):
+    """Set several servo angles in one request.
+
+    Args (in data dict):
+        angles: Dict mapping channel -> angle
+        raw: If true, don't apply calibration (default False)
+    """
+    angles = data.get("angles", {})
+    raw = data.get("raw", False)
+    results = {}
+    for channel, angle in angles.items():
+        results[int(channel)] = set_servo(int(channel), angle, apply_offset=not raw)
+    success = all(results.values())
+    return {"status": "ok" if success else "error", "results": results}
+
+@app.post("/api/servo/batch/disable")
+async def disable_servo_batch_endpoint(data: dict = {}):
+    """Disable PWM on several servos in one request (default: all 12 leg servos)"""
+    channels = data.get("channels", list(range(12)))
+    results = {int(ch): disable_servo(int(ch)) for ch in channels}
+    success = all(results.values())
+    return {"status": "ok" if success else "error", "results": results}
+
+@app.post("/api/servo/sweep")
+def sweep_servo_endpoint(data: dict):
+    """Sweep a servo and stream IMU angles after every step (one JSON object per line).
+
+    Runs the step loop next to the hardware so clients don't pay an HTTP round trip
+    per step. The sweep stops when the client closes the connection.
+
+    Args (in data dict):
+        channel: Servo channel
+        start, stop: Sweep range in degrees (inclusive)
+        step: Degrees per step (default 5)
+        delay: Seconds between moving and sampling the IMU (default 0.1)
+        raw: If true, don't apply calibration (default False)
+        max_step, slow_zone: Optional adaptive stepping - step shrinks from max_step
+            towards 1° as the smoothed IMU change per step approaches slow_zone degrees
+    """
+    channel = int(data["channel"])
+    start = data.get("start", 0)
+    stop = data.get("stop", 180)
+    delay = data.get("delay", 0.1)
+    raw = data.get("raw", False)
+    max_step = data.get("max_step")
+    slow_zone = data.get("slow_zone")
+    step = max_step or data.get("step", 5)
+
+    def read_angles():
+        if gait_controller and gait_controller.balance:
+            return gait_controller.balance.get_angles()
+        return 0.0, 0.0
+
+    def generate():
+        nonlocal step
+        angle = start
+        prev_pitch, prev_roll = read_angles()
+        ewma_delta = 0.0
+        while angle <= stop:
+            set_servo(channel, angle, apply_offset=not raw)
+            time.sleep(delay)
+            pitch, roll = read_angles()
+            yield json.dumps({"angle": angle, "pitch": round(pitch, 2), "roll": round(roll, 2)}) + "\n"
+
+            if max_step and slow_zone:
+                delta = max(abs(pitch - prev_pitch), abs(roll - prev_roll))
+                ewma_delta = 0.7 * ewma_delta + 0.3 * delta
+                step = max(1, min(max_step, int(max_step * (1 - ewma_delta / slow_zone))))
+            prev_pitch, prev_roll = pitch, roll
+            angle += step
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 @app.post("/api/servo/{channel}")
 async def set_servo_endpoint(channel: int, data: dict):
     """Set servo angle via REST API"""
@@ -1473,6 +1567,41 @@ def get_balance_angles():
     except Exception as e:
         return {"pitch": 0, "roll": 0, "error": str(e)}
 
+ANGLE_PUSH_INTERVAL = 0.05    # 20 Hz sampling for /ws/balance/angles
+ANGLE_PUSH_DELTA = 0.1        # degrees; smaller changes are not pushed
+ANGLE_PUSH_KEEPALIVE = 1.0    # push anyway after this long, so clients know the feed is alive
+
+@app.websocket("/ws/balance/angles")
+async def balance_angles_ws(ws: WebSocket):
+    """Push /api/balance/angles frames when pitch/roll change (plus a 1 s keepalive)."""
+    await ws.accept()
+    last = None
+    last_sent = 0.0
+    try:
+        while True:
+            # IMU reads block on I2C, keep them off the event loop
+            angles = await asyncio.to_thread(get_balance_angles)
+            now = time.monotonic()
+            pr = (angles.get("pitch", 0), angles.get("roll", 0))
+            if (last is None or now - last_sent >= ANGLE_PUSH_KEEPALIVE
+                    or abs(pr[0] - last[0]) > ANGLE_PUSH_DELTA or abs(pr[1] - last[1]) > ANGLE_PUSH_DELTA):
+                await ws.send_json(angles)
+                last, last_sent = pr, now
+            await asyncio.sleep(ANGLE_PUSH_INTERVAL)
+    except (WebSocketDisconnect, RuntimeError, OSError):
+        # Depending on the server, sending to a closed socket raises any of these
+        pass
+
+@app.get("/api/dashboard")
+def get_dashboard():
+    """Balance angles, gait, balance and robot status in one response (control page polling)"""
+    return {
+        "angles": get_balance_angles(),
+        "gait": get_gait_status(),
+        "balance": get_balance_status(),
+        "status": get_status(),
+    }
+
 @app.get("/api/balance/config")
 def get_balance_config():
     """Get current balance controller configuration."""
@@ -1618,26 +1747,24 @@ def get_tuning():
 
     return result
 
-@app.post("/api/tuning/{key}")
-async def save_tuning_param(key: str, data: dict):
-    """Save a tuning parameter to gait controller AND persist to file"""
-    value = data.get("value")
+def _apply_tuning_param(key: str, value):
+    """Apply one tuning parameter to tuning_config (and the live controllers).
 
+    Returns the canonical key, or None for an unknown parameter. Does not persist.
+    """
     # Gait parameters
     if key in ["cycle_time", "step_height", "step_length", "speed"]:
         tuning_config["gait"][key] = value
         if GAIT_AVAILABLE and gait_controller:
             gait_controller.set_params(**{key: value})
-        save_tuning_to_file()
-        return {"ok": True, "key": key, "value": value, "persisted": True}
+        return key
 
     # Balance parameters
     elif key in ["balance_kp", "kp"]:
         tuning_config["balance"]["kp"] = value
         if gait_controller:
             gait_controller.set_balance_kp(value)
-        save_tuning_to_file()
-        return {"ok": True, "key": "balance_kp", "value": value, "persisted": True}
+        return "balance_kp"
 
     elif key in ["pitch_gain", "roll_gain"]:
         tuning_config["balance"][key] = value
@@ -1651,17 +1778,62 @@ async def save_tuning_param(key: str, data: dict):
                 log_tuning.info(f"Applied {key}={value} to balance controller")
             except AttributeError:
                 log_tuning.warning(f"Balance controller doesn't support {key}")
-        save_tuning_to_file()
-        return {"ok": True, "key": key, "value": value, "persisted": True}
+        return key
 
     # Stand parameters
     elif key in ["knee_bend", "ankle_compensation"]:
         tuning_config["stand"][key] = value
+        return key
+
+    return None
+
+@app.post("/api/tuning/bulk")
+async def save_tuning_bulk(data: dict):
+    """Save several tuning parameters at once, persisting tuning.json a single time.
+
+    Declared before /api/tuning/{key} so "bulk" is not taken for a parameter name.
+    """
+    applied = {}
+    unknown = []
+    for key, value in data.items():
+        name = _apply_tuning_param(key, value)
+        if name is None:
+            unknown.append(key)
+        else:
+            applied[name] = value
+    if applied:
         save_tuning_to_file()
-        return {"ok": True, "key": key, "value": value, "persisted": True}
+    result = {"ok": not unknown, "applied": applied, "persisted": bool(applied)}
+    if unknown:
+        result["error"] = f"Unknown tuning parameters: {unknown}"
+    return result
 
-    else:
+GAIT_PRESETS = {
+    "slow": {"cycle_time": 1.2, "step_height": 20},
+    "normal": {"cycle_time": 0.8, "step_height": 25},
+    "fast": {"cycle_time": 0.5, "step_height": 30},
+}
+
+@app.post("/api/gait/preset/{name}")
+async def apply_gait_preset(name: str):
+    """Apply a gait preset, persist it and return the updated tuning (saves the client a GET)"""
+    preset = GAIT_PRESETS.get(name)
+    if preset is None:
+        return {"status": "error", "message": f"Unknown preset: {name}", "available": list(GAIT_PRESETS)}
+    for key, value in preset.items():
+        _apply_tuning_param(key, value)
+    save_tuning_to_file()
+    return {"status": "ok", "preset": name, "tuning": get_tuning()}
+
+@app.post("/api/tuning/{key}")
+async def save_tuning_param(key: str, data: dict):
+    """Save a tuning parameter to gait controller AND persist to file"""
+    value = data.get("value")
+    name = _apply_tuning_param(key, value)
+    if name is None:
         return {"error": f"Unknown tuning parameter: {key}"}
+    save_tuning_to_file()
+    return {"ok": True, "key": name, "value": value, "persisted": True}
 
 @app.post("/api/balance/kp")
 async def set_balance_kp_endpoint(data: dict):